@@ -11,14 +11,17 @@ st.info("✅ App started initializing...")
 
 from utils import (
     plot_department_stress, plot_heart_rate_distribution,
-    plot_spo2_distribution, plot_mood_distribution,
+    plot_spo2_distribution, plot_mood_distribution, plot_stress_trend,
     create_gauge_chart, create_department_comparison_chart,
     get_mood_emoji
 )
 from data_processor import (
-    load_data, get_departments, filter_data,
-    get_summary_metrics, get_department_rankings
+    get_dashboard_views, get_time_window,
+    get_departments, filter_data, get_department_rankings,
+    set_cache_ttl, data_cache, dashboard_snapshots
 )
+from alerts import get_summary_metrics, HR_ALERT_THRESHOLD, STRESS_ALERT_THRESHOLD, SPO2_ALERT_THRESHOLD
+from database import archive_health_metrics, get_dataset_status, get_pool_status, RETENTION_DAYS
 from chatbot import WellnessChatbot
 
 # Page configuration
@@ -272,10 +275,6 @@ with col2:
     st.markdown("<h1 style='font-size:2.5rem; margin-bottom:0.5rem;'>HR Wellness Dashboard</h1>", unsafe_allow_html=True)
     st.markdown("Monitor employee health metrics and analyze stress levels in real-time")
 
-# Load data
-with st.spinner("Loading wellness data..."):
-    df = load_data()
-
 # Sidebar for filters
 st.sidebar.markdown("## Dashboard Controls")
 
@@ -283,6 +282,34 @@ st.sidebar.markdown("## Dashboard Controls")
 st.sidebar.markdown(f'{svg_logo}', unsafe_allow_html=True)
 st.sidebar.markdown("---")
 
+# Time range filter
+st.sidebar.markdown("## Time Range")
+time_range = st.sidebar.radio(
+    "Select Time Period",
+    ["Today", "This Week", "This Month", "Quarter"],
+    index=0
+)
+
+# Load data; every session shares one snapshot per time period, refreshed in the background
+with st.spinner("Loading wellness data..."):
+    views = get_dashboard_views(time_range)
+if views is None:
+    st.error("Could not load the wellness data. Check the database connection.")
+    st.stop()
+latest_df, df, trend_df, dept_df = views.latest, views.period, views.trend, views.departments
+
+period_start, _ = get_time_window(time_range)
+if df is None:
+    st.warning(f"No readings recorded since {period_start:%d %b %Y}. Showing the latest reading per employee.")
+    df = latest_df
+    dept_df = df
+else:
+    st.caption(f"Averages of {int(df['reading_count'].sum()):,} readings since {period_start:%d %b %Y, %H:%M}")
+
+# Partitioned by department once per snapshot; the filters, charts and assistant share its frame
+dataset = views.dataset
+df = dataset.frame
+
 # Department filter
 departments = get_departments(df)
 selected_department = st.sidebar.selectbox("Select Department", departments)
@@ -301,7 +328,7 @@ with st.sidebar.expander("Customize Thresholds"):
         "Heart Rate Alert (bpm)",
         min_value=80,
         max_value=120,
-        value=100,
+        value=HR_ALERT_THRESHOLD,
         step=5,
         help="Employees with heart rate above this value will be flagged"
     )
@@ -310,7 +337,7 @@ with st.sidebar.expander("Customize Thresholds"):
         "Stress Level Alert",
         min_value=50,
         max_value=90,
-        value=70,
+        value=STRESS_ALERT_THRESHOLD,
         step=5,
         help="Employees with stress level above this value will be flagged"
     )
@@ -319,19 +346,11 @@ with st.sidebar.expander("Customize Thresholds"):
         "SpO2 Alert (%)",
         min_value=90,
         max_value=95,
-        value=92,
+        value=SPO2_ALERT_THRESHOLD,
         step=1,
         help="Employees with SpO2 below this value will be flagged"
     )
 
-# Time range filter (for future implementation with time series data)
-st.sidebar.markdown("## Time Range")
-time_range = st.sidebar.radio(
-    "Select Time Period",
-    ["Today", "This Week", "This Month", "Quarter"],
-    index=0
-)
-
 # Data visualization options
 st.sidebar.markdown("## Visualization Options")
 chart_type = st.sidebar.selectbox(
@@ -365,10 +384,21 @@ with st.sidebar.expander("Export Options"):
         st.success(f"Report scheduled: {report_type}")
 
 # Apply filters
-filtered_df = filter_data(df, selected_department)
+filtered_df = filter_data(dataset, selected_department)
+
+# Calculate summary metrics once for the cards, gauges and assistant
+alert_thresholds = {
+    'hr_threshold': hr_threshold,
+    'stress_threshold': stress_threshold,
+    'spo2_threshold': spo2_threshold
+}
+metrics = get_summary_metrics(filtered_df, **alert_thresholds)
 
-# Calculate summary metrics
-metrics = get_summary_metrics(filtered_df)
+# Employees flagged by the alert thresholds, for the cards and the employee list;
+# the index is built once per snapshot, so moving a slider only repeats binary searches
+alert_index = views.alerts
+flagged = {rule: set(ids) for rule, ids in alert_index.flagged(**alert_thresholds, department=selected_department).items()}
+flagged_ids = alert_index.flagged_employees(**alert_thresholds, department=selected_department)
 
 # Database information
 st.sidebar.markdown("## Database")
@@ -385,13 +415,63 @@ with st.sidebar.expander("Admin Controls"):
     
     with col1:
         if st.button("Reset Demo Data"):
-            # This will clear the cache and reload the data
-            st.cache_data.clear()
+            # Drop the cached loader results and shared snapshots so the data is
+            # reloaded; caches keyed by frame contents refresh with it
+            data_cache.invalidate()
+            dashboard_snapshots.invalidate()
             st.rerun()
     
     with col2:
         if st.button("Archive Data"):
-            st.info("This would archive old data to storage.")
+            archive_summary = archive_health_metrics()
+            if archive_summary is None:
+                st.error("Archiving failed. Check the logs for details.")
+            else:
+                st.success(f"Archived {archive_summary['rows']} readings older than {RETENTION_DAYS} days.")
+    
+    dataset_status = get_dataset_status()
+    if dataset_status and dataset_status['metric_count'] is not None:
+        latest_reading = dataset_status['latest_timestamp']
+        latest_text = f"latest {latest_reading:%d %b %Y %H:%M}" if latest_reading else "no readings yet"
+        st.caption(
+            f"{dataset_status['metric_count']:,} readings from {dataset_status['employee_count']:,} employees, "
+            f"{latest_text} (data version {dataset_status['data_version']}, "
+            f"schema version {dataset_status['schema_version']})"
+        )
+    
+    st.markdown("#### Data Cache")
+    cache_stats = data_cache.stats()
+    cache_col1, cache_col2 = st.columns(2)
+    with cache_col1:
+        st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        st.metric("Misses", cache_stats['misses'])
+    with cache_col2:
+        st.metric("Memory Hits", cache_stats['memory_hits'])
+        st.metric("Disk Hits", cache_stats['disk_hits'])
+    st.caption(
+        f"{cache_stats['memory_entries']} results in memory for data version {cache_stats['data_version']}, "
+        f"{cache_stats['invalidations']} invalidated and {cache_stats['expirations']} expired "
+        f"after {cache_stats['ttl_seconds'] // 60} minutes"
+    )
+    snapshot_stats = dashboard_snapshots.stats()
+    st.caption(
+        f"{len(snapshot_stats['views'])} shared snapshots serving {snapshot_stats['requests']} requests "
+        f"from {snapshot_stats['builds']} builds"
+    )
+    
+    st.markdown("#### Connection Pool")
+    pool_status = get_pool_status()
+    pool_col1, pool_col2 = st.columns(2)
+    with pool_col1:
+        st.metric("Checked Out", pool_status['checked_out'])
+        st.metric("Idle", pool_status['checked_in'])
+    with pool_col2:
+        st.metric("Avg Wait", f"{pool_status['avg_wait_ms']:.1f} ms")
+        st.metric("Max Wait", f"{pool_status['max_wait_ms']:.1f} ms")
+    st.caption(
+        f"Pool size {pool_status['pool_size']} with {pool_status['overflow']} overflow connections, "
+        f"{pool_status['checkouts']} checkouts since startup"
+    )
     
     st.markdown("#### User Management")
     user_role = st.selectbox(
@@ -408,10 +488,15 @@ with st.sidebar.expander("Admin Controls"):
     )
     st.caption("In a production environment, this would automatically refresh data from sensors.")
     
+    # Employee List page size, adjustable under the advanced settings
+    max_records = 100
     advanced_settings = st.checkbox("Show Advanced Settings", value=False)
     if advanced_settings:
         st.markdown("#### System Settings")
-        cache_time = st.number_input("Cache Time (minutes)", min_value=1, max_value=60, value=5)
+        cache_time = st.number_input(
+            "Cache Time (minutes)", min_value=1, max_value=60, value=max(data_cache.ttl_seconds // 60, 1)
+        )
+        set_cache_ttl(cache_time * 60)
         max_records = st.number_input("Max Records to Display", min_value=10, max_value=500, value=100)
         st.caption("These settings would affect system performance.")
 
@@ -446,8 +531,8 @@ st.markdown("""
 metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
 
 # Determine status classes based on thresholds
-hr_status = "status-good" if metrics['avg_heart_rate'] < hr_threshold else "status-critical" 
-spo2_status = "status-critical" if metrics['avg_spo2'] < spo2_threshold else "status-good"
+hr_status = "status-good" if metrics.avg_heart_rate < hr_threshold else "status-critical" 
+spo2_status = "status-critical" if metrics.avg_spo2 < spo2_threshold else "status-good"
 stress_status = "status-good" if stress_threshold > 70 else "status-warning" if stress_threshold > 50 else "status-critical"
 
 with metric_col1:
@@ -457,10 +542,13 @@ with metric_col1:
             <h4 style="margin: 0;">Total Employees</h4>
             <div class="status-indicator status-good"></div>
         </div>
-        <div class="metric-value pulse-animation">{metrics['total_employees']}</div>
+        <div class="metric-value pulse-animation">{metrics.total_employees}</div>
         <div class="metric-label">
             {f"In {selected_department}" if selected_department != 'All Departments' else "Across all departments"}
         </div>
+        <div class="metric-label" style="color: {'#F44336' if len(flagged_ids) else '#c0c0c0'};">
+            {len(flagged_ids)} flagged ({len(flagged['high_heart_rate'])} heart rate, {len(flagged['low_spo2'])} SpO2, {len(flagged['high_stress'])} stress)
+        </div>
         <div style="margin-top: 10px; font-size: 12px; color: #c0c0c0;">
             <span style="display: inline-block; width: 8px; height: 8px; background-color: #4a56e2; margin-right: 5px; border-radius: 50%;"></span> Updated {current_time.split(',')[1].strip()}
         </div>
@@ -469,7 +557,7 @@ with metric_col1:
 
 with metric_col2:
     # Add animation if heart rate is outside normal range
-    animation_class = "pulse-animation" if metrics['avg_heart_rate'] > 100 or metrics['avg_heart_rate'] < 60 else ""
+    animation_class = "pulse-animation" if metrics.avg_heart_rate > 100 or metrics.avg_heart_rate < 60 else ""
     
     st.markdown(f"""
     <div class="data-card hover-zoom">
@@ -477,17 +565,17 @@ with metric_col2:
             <h4 style="margin: 0;">Average Heart Rate</h4>
             <div class="status-indicator {hr_status}"></div>
         </div>
-        <div class="metric-value {animation_class}">{metrics['avg_heart_rate']:.1f} <span style="font-size: 16px;">bpm</span></div>
+        <div class="metric-value {animation_class}">{metrics.avg_heart_rate:.1f} <span style="font-size: 16px;">bpm</span></div>
         <div class="metric-label">Normal range: 60-100 bpm</div>
         <div style="height: 5px; width: 100%; background-color: rgba(74, 86, 226, 0.2); border-radius: 3px; margin-top: 10px;">
-            <div style="height: 100%; width: {min(100, metrics['avg_heart_rate']/1.2)}%; background-color: #4a56e2; border-radius: 3px;"></div>
+            <div style="height: 100%; width: {min(100, metrics.avg_heart_rate/1.2)}%; background-color: #4a56e2; border-radius: 3px;"></div>
         </div>
     </div>
     """, unsafe_allow_html=True)
 
 with metric_col3:
     # Add animation if SpO2 is below healthy range
-    animation_class = "pulse-animation" if metrics['avg_spo2'] < 95 else ""
+    animation_class = "pulse-animation" if metrics.avg_spo2 < 95 else ""
     
     st.markdown(f"""
     <div class="data-card hover-zoom">
@@ -495,17 +583,17 @@ with metric_col3:
             <h4 style="margin: 0;">Average SpO2</h4>
             <div class="status-indicator {spo2_status}"></div>
         </div>
-        <div class="metric-value {animation_class}">{metrics['avg_spo2']:.1f}<span style="font-size: 16px;">%</span></div>
+        <div class="metric-value {animation_class}">{metrics.avg_spo2:.1f}<span style="font-size: 16px;">%</span></div>
         <div class="metric-label">Healthy: ≥95%</div>
         <div style="height: 5px; width: 100%; background-color: rgba(74, 86, 226, 0.2); border-radius: 3px; margin-top: 10px;">
-            <div style="height: 100%; width: {metrics['avg_spo2']}%; background-color: {'#4CAF50' if metrics['avg_spo2'] >= 95 else '#FFC107' if metrics['avg_spo2'] >= 92 else '#F44336'}; border-radius: 3px;"></div>
+            <div style="height: 100%; width: {metrics.avg_spo2}%; background-color: {'#4CAF50' if metrics.avg_spo2 >= 95 else '#FFC107' if metrics.avg_spo2 >= 92 else '#F44336'}; border-radius: 3px;"></div>
         </div>
     </div>
     """, unsafe_allow_html=True)
 
 with metric_col4:
     # Always pulse animation for high stress
-    animation_class = "pulse-animation" if metrics['high_stress_count'] > 0 else ""
+    animation_class = "pulse-animation" if metrics.high_stress_count > 0 else ""
     
     st.markdown(f"""
     <div class="data-card hover-zoom">
@@ -513,12 +601,12 @@ with metric_col4:
             <h4 style="margin: 0;">High Stress Employees</h4>
             <div class="status-indicator {stress_status}"></div>
         </div>
-        <div class="metric-value {animation_class}">{metrics['high_stress_count']}</div>
-        <div class="metric-label" style="color: {'#F44336' if metrics['high_stress_percent'] > 20 else '#FFC107' if metrics['high_stress_percent'] > 10 else '#c0c0c0'};">
-            {metrics['high_stress_percent']:.1f}% of total
+        <div class="metric-value {animation_class}">{metrics.high_stress_count}</div>
+        <div class="metric-label" style="color: {'#F44336' if metrics.high_stress_percent > 20 else '#FFC107' if metrics.high_stress_percent > 10 else '#c0c0c0'};">
+            {metrics.high_stress_percent:.1f}% of total (stress above {metrics.stress_threshold})
         </div>
         <div style="height: 5px; width: 100%; background-color: rgba(74, 86, 226, 0.2); border-radius: 3px; margin-top: 10px;">
-            <div style="height: 100%; width: {metrics['high_stress_percent']}%; background-color: {'#F44336' if metrics['high_stress_percent'] > 20 else '#FFC107' if metrics['high_stress_percent'] > 10 else '#4CAF50'}; border-radius: 3px;"></div>
+            <div style="height: 100%; width: {metrics.high_stress_percent}%; background-color: {'#F44336' if metrics.high_stress_percent > 20 else '#FFC107' if metrics.high_stress_percent > 10 else '#4CAF50'}; border-radius: 3px;"></div>
         </div>
     </div>
     """, unsafe_allow_html=True)
@@ -532,11 +620,15 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(plot_department_stress(df), use_container_width=True)
+        st.plotly_chart(plot_department_stress(dept_df), use_container_width=True)
     
     with col2:
         st.plotly_chart(plot_mood_distribution(filtered_df, selected_department), use_container_width=True)
     
+    if show_trend_lines:
+        if trend_df is not None and not trend_df.empty:
+            st.plotly_chart(plot_stress_trend(trend_df, selected_department), use_container_width=True)
+    
     # HR and SpO2 distributions
     st.markdown("### Health Metrics Distribution")
     col1, col2 = st.columns(2)
@@ -549,7 +641,7 @@ with tab1:
     
     # Department ranking table
     st.markdown("### Department Wellness Rankings")
-    dept_rankings = get_department_rankings(df)
+    dept_rankings = get_department_rankings(dept_df)
     st.dataframe(
         dept_rankings,
         use_container_width=True,
@@ -576,10 +668,9 @@ with tab2:
     gauge_col1, gauge_col2, gauge_col3 = st.columns(3)
     
     with gauge_col1:
-        avg_hr = filtered_df['heart_rate'].mean()
         st.plotly_chart(
             create_gauge_chart(
-                avg_hr, "Avg Heart Rate (bpm)", 
+                metrics.avg_heart_rate, "Avg Heart Rate (bpm)", 
                 40, 120, 
                 (60, 100), (40, 60), (100, 120)
             ),
@@ -587,10 +678,9 @@ with tab2:
         )
     
     with gauge_col2:
-        avg_spo2 = filtered_df['spo2'].mean()
         st.plotly_chart(
             create_gauge_chart(
-                avg_spo2, "Avg SpO2 (%)", 
+                metrics.avg_spo2, "Avg SpO2 (%)", 
                 90, 100, 
                 (95, 100), (92, 95), (90, 92)
             ),
@@ -598,10 +688,9 @@ with tab2:
         )
     
     with gauge_col3:
-        avg_stress = filtered_df['stress_score'].mean()
         st.plotly_chart(
             create_gauge_chart(
-                avg_stress, "Avg Stress Score", 
+                metrics.avg_stress, "Avg Stress Score", 
                 0, 100, 
                 (0, 50), (50, 75), (75, 100)
             ),
@@ -611,99 +700,102 @@ with tab2:
     # Employee list with search
     st.markdown("### Employee List")
     search_term = st.text_input("Search by Employee ID or Name", "")
+    flagged_only = st.checkbox(f"Show only flagged employees ({len(flagged_ids)})", value=False)
+    
+    sort_options = {
+        "Employee ID": "employee_id",
+        "Name": "name",
+        "Department": "department",
+        "Heart Rate": "heart_rate",
+        "SpO2": "spo2",
+        "Stress Score": "stress_score"
+    }
+    if search_term:
+        sort_options = {"Best Match": None, **sort_options}
+    sort_col1, sort_col2 = st.columns([3, 1])
+    with sort_col1:
+        sort_label = st.selectbox("Sort by", list(sort_options))
+    with sort_col2:
+        sort_descending = st.checkbox("Descending", value=False)
+    sort_by = sort_options[sort_label]
     
     if search_term:
-        search_results = filtered_df[
-            filtered_df['employee_id'].str.contains(search_term, case=False) | 
-            filtered_df['name'].str.contains(search_term, case=False)
-        ]
+        # Ranked matches from the snapshot's prebuilt index, limited to the selected department
+        matches = views.search.search(search_term, rows=dataset.bounds(selected_department))
+        search_results = df.iloc[matches]
     else:
         search_results = filtered_df
     
-    # Display employees with pagination
-    employees_per_page = 10
-    total_pages = (len(search_results) + employees_per_page - 1) // employees_per_page
+    if flagged_only:
+        search_results = search_results[search_results['employee_id'].isin(flagged_ids)]
     
-    if len(search_results) > 0:
-        # Only show slider if there's more than one page
+    # Display employees with pagination, max_records per page
+    total_employees = len(search_results)
+    total_pages = max(1, (total_employees + max_records - 1) // max_records)
+    
+    if total_employees > 0:
+        # Only show page selector if there's more than one page
         if total_pages > 1:
-            page = st.slider("Page", 1, total_pages, 1)
+            page = st.number_input("Page", min_value=1, max_value=total_pages, value=1)
         else:
             page = 1
-            
-        start_idx = (page - 1) * employees_per_page
-        end_idx = min(start_idx + employees_per_page, len(search_results))
         
+        start_idx = (page - 1) * max_records
+        end_idx = min(start_idx + max_records, total_employees)
+        
+        # Page the snapshot's rows so the grid, count, filters and alert flags share one source
+        if sort_by:
+            search_results = search_results.sort_values(
+                [sort_by, 'employee_id'], ascending=[not sort_descending, True], kind='stable'
+            )
         displayed_employees = search_results.iloc[start_idx:end_idx]
         
-        for _, employee in displayed_employees.iterrows():
-            col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
-            
-            with col1:
-                # Determine status indicators based on thresholds
-                hr_status = "status-good" if employee['heart_rate'] < hr_threshold else "status-critical"
-                spo2_status = "status-critical" if employee['spo2'] < spo2_threshold else "status-good"
-                stress_status = "status-good" if employee['stress_score'] < stress_threshold else "status-critical"
-                
-                # Add pulse animation to elements that exceed thresholds
-                hr_class = "pulse-animation" if employee['heart_rate'] >= hr_threshold else ""
-                spo2_class = "pulse-animation" if employee['spo2'] < spo2_threshold else ""
-                stress_class = "pulse-animation" if employee['stress_score'] >= stress_threshold else ""
-                
-                st.markdown(f"""
-                <div class='employee-card neon-border'>
-                    <strong class="glow-text">{employee['name']}</strong> ({employee['employee_id']})<br>
-                    <small>{employee['department']} | Age: {employee['age']} | {employee['gender']}</small>
-                    <div style="position: absolute; top: 10px; right: 10px;">
-                        <span class="status-indicator {hr_status if employee['heart_rate'] > 100 else spo2_status if employee['spo2'] < 95 else stress_status if employee['stress_score'] > 70 else 'status-good'}"></span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"""
-                <div class='employee-card hover-zoom'>
-                    <div class='metric-label'>Heart Rate</div>
-                    <div class='metric-value {hr_class}'>{employee['heart_rate']} bpm</div>
-                    <div class="status-indicator {hr_status}" style="display: inline-block;"></div>
-                    <small>{" " * 5}Normal range: 60-100 bpm</small>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(f"""
-                <div class='employee-card hover-zoom'>
-                    <div class='metric-label'>SpO2</div>
-                    <div class='metric-value {spo2_class}'>{employee['spo2']}%</div>
-                    <div class="status-indicator {spo2_status}" style="display: inline-block;"></div>
-                    <small>{" " * 5}Healthy: ≥95%</small>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col4:
-                st.markdown(f"""
-                <div class='employee-card hover-zoom'>
-                    <div class='metric-label'>Mood</div>
-                    <div class='metric-value'>{employee['mood']} {get_mood_emoji(employee['mood'])}</div>
-                    <div class='metric-label {stress_class}'>Stress: <span class="glow-text">{employee['stress_score']}</span></div>
-                    <div class="status-indicator {stress_status}" style="display: inline-block;"></div>
-                </div>
-                """, unsafe_allow_html=True)
+        # Alerts from the alert index, joined into one label per row
+        alert_flags = pd.DataFrame({
+            label: displayed_employees['employee_id'].isin(flagged[rule])
+            for rule, label in [('high_heart_rate', 'Heart rate'), ('low_spo2', 'SpO2'), ('high_stress', 'Stress')]
+        })
+        alert_labels = alert_flags.dot(alert_flags.columns + ', ').str.rstrip(', ')
+        
+        moods = displayed_employees['mood'].astype(str)
+        employee_table = pd.DataFrame({
+            "Employee": displayed_employees['name'],
+            "ID": displayed_employees['employee_id'],
+            "Department": displayed_employees['department'].astype(str),
+            "Age": displayed_employees['age'],
+            "Gender": displayed_employees['gender'],
+            "Heart Rate": displayed_employees['heart_rate'],
+            "SpO2": displayed_employees['spo2'],
+            "Stress": displayed_employees['stress_score'],
+            "Mood": moods + " " + moods.map(get_mood_emoji),
+            "Alerts": alert_labels
+        })
+        st.dataframe(
+            employee_table,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Heart Rate": st.column_config.NumberColumn("Heart Rate", format="%.1f bpm"),
+                "SpO2": st.column_config.NumberColumn("SpO2", format="%.1f%%"),
+                "Stress": st.column_config.ProgressColumn("Stress", min_value=0, max_value=100, format="%.1f"),
+                "Alerts": st.column_config.TextColumn("Alerts", help="Alert thresholds exceeded in the sidebar")
+            }
+        )
         
-        st.caption(f"Showing {start_idx+1}-{end_idx} of {len(search_results)} employees")
+        st.caption(f"Showing {start_idx+1}-{end_idx} of {total_employees} employees")
     else:
         st.info("No employees found matching your search criteria.")
 
 with tab3:
     # Comparative insights
     st.markdown("### Department Health Comparison")
-    st.plotly_chart(create_department_comparison_chart(df), use_container_width=True)
+    st.plotly_chart(create_department_comparison_chart(dept_df), use_container_width=True)
     
     # Custom analysis explanation
     st.markdown("### Stress Analysis Insights")
     
     # Calculate high-stress departments
-    high_stress_depts = df.groupby('department')['stress_score'].mean().sort_values(ascending=False)
+    high_stress_depts = dept_df.groupby('department', observed=True)['stress_score'].mean().sort_values(ascending=False)
     highest_stress_dept = high_stress_depts.index[0]
     highest_stress_value = high_stress_depts.iloc[0]
     
@@ -949,13 +1041,13 @@ with tab4:
     
     # Create a session state for chat history if it doesn't exist
     if 'chatbot' not in st.session_state:
-        st.session_state.chatbot = WellnessChatbot(df)
+        st.session_state.chatbot = WellnessChatbot(dataset, alert_index)
     
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
     
     # Update chatbot with latest data
-    st.session_state.chatbot.update_data(df)
+    st.session_state.chatbot.update_data(dataset, alert_thresholds, alert_index)
     
     # Display a futuristic chat header
     st.markdown(f"""
@@ -1070,7 +1162,7 @@ with tab4:
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
     if 'chatbot' not in st.session_state:
-        st.session_state.chatbot = WellnessChatbot(df)
+        st.session_state.chatbot = WellnessChatbot(dataset, alert_index)
                 
     # Create buttons for each query
     for i, query in enumerate(query_options):
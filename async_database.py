@@ -0,0 +1,211 @@
+import asyncio
+import importlib
+import logging
+import threading
+import time
+import pandas as pd
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+import database
+from database import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS, INGEST_CHUNK_SIZE, METRIC_COLUMNS,
+    LATEST_METRICS_QUERY
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Async driver (and the module it needs) for each supported database backend
+ASYNC_DRIVERS = {
+    'postgresql': ('postgresql+asyncpg', 'asyncpg'),
+    'sqlite': ('sqlite+aiosqlite', 'aiosqlite'),
+}
+
+_async_engine = None
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_async_url(url=DATABASE_URL):
+    """
+    Convert a synchronous database URL to its async driver equivalent
+    
+    Args:
+        url: Database connection string, e.g. postgresql://... or sqlite:///...
+    
+    Returns:
+        SQLAlchemy URL using asyncpg or aiosqlite
+    """
+    url = make_url(url)
+    drivername, _ = ASYNC_DRIVERS[url.get_backend_name()]
+    return url.set(drivername=drivername)
+
+def is_available(url=DATABASE_URL):
+    """Check whether the async driver for the configured database is installed"""
+    try:
+        _, module = ASYNC_DRIVERS[make_url(url).get_backend_name()]
+        importlib.import_module(module)
+        return True
+    except Exception:
+        return False
+
+def get_async_engine():
+    """Return the process-wide async engine, creating it on first use"""
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_url()
+        options = {'pool_pre_ping': DB_POOL_PRE_PING, 'pool_recycle': DB_POOL_RECYCLE}
+        connect_args = {}
+        if url.get_backend_name() == 'postgresql':
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+            if DB_STATEMENT_TIMEOUT_MS:
+                connect_args['server_settings'] = {'statement_timeout': str(DB_STATEMENT_TIMEOUT_MS)}
+        _async_engine = create_async_engine(url, connect_args=connect_args, **options)
+        logger.info("Async database engine created")
+    return _async_engine
+
+def _get_loop():
+    """Return the background event loop that owns the async engine"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='async-database', daemon=True).start()
+    return _loop
+
+def run(coro):
+    """
+    Run a coroutine on the shared background event loop and wait for the result
+    
+    Streamlit executes the script in a plain thread; running every coroutine on
+    one long-lived loop lets the async connection pool be reused across reruns
+    and sessions instead of being tied to a per-call asyncio.run() loop.
+    
+    Args:
+        coro: Coroutine to run
+    
+    Returns:
+        The coroutine's result
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+async def _read(read_function, *args):
+    """Run one of database's _read_* helpers on a pooled async connection"""
+    async with get_async_engine().connect() as conn:
+        return await conn.run_sync(read_function, *args)
+
+async def load_data_from_db_async():
+    """
+    Load the latest health metrics per employee from the database
+    
+    Returns:
+        DataFrame with employee health metrics, or None if error
+    """
+    try:
+        async with get_async_engine().connect() as conn:
+            df = await conn.run_sync(lambda sync_conn: pd.read_sql(LATEST_METRICS_QUERY, sync_conn))
+        logger.info(f"Loaded {len(df)} employee records from database")
+        return df
+    
+    except Exception as e:
+        logger.error(f"Error loading data from database: {e}")
+        return None
+
+async def has_data_async():
+    """Async version of database.has_data, reading the same dataset_status row"""
+    try:
+        status = await _read(database._read_dataset_status)
+        return bool(status['has_data'])
+    except Exception as e:
+        logger.error(f"Error checking database data: {e}")
+        return False
+
+async def load_aggregates_from_db_async(start, end):
+    """Async version of database.load_aggregates_from_db"""
+    try:
+        return await _read(database._read_aggregates, start, end)
+    except Exception as e:
+        logger.error(f"Error loading aggregates from database: {e}")
+        return None
+
+async def load_trend_from_db_async(start, end, bucket='day'):
+    """Async version of database.load_trend_from_db"""
+    if bucket not in ('hour', 'day'):
+        raise ValueError(f"Unsupported trend bucket: {bucket}")
+    
+    try:
+        return await _read(database._read_trend, start, end, bucket)
+    except Exception as e:
+        logger.error(f"Error loading metric trend from database: {e}")
+        return None
+
+async def load_rollups_from_db_async(level, granularity, start, end):
+    """Async version of database.load_rollups_from_db"""
+    try:
+        return await _read(database._read_rollups, level, granularity, start, end)
+    except Exception as e:
+        logger.error(f"Error loading {level} rollups from database: {e}")
+        return None
+
+async def load_period_views_async(start, end, bucket):
+    """
+    Load everything a dashboard period needs with the queries running concurrently
+    
+    Args:
+        start: Start of the window (inclusive)
+        end: End of the window (exclusive)
+        bucket: 'hour' or 'day', used for the trend and the department rollups
+    
+    Returns:
+        Tuple of (employee aggregates, department trend, department rollups);
+        each item is None if its query failed
+    """
+    return await asyncio.gather(
+        load_aggregates_from_db_async(start, end),
+        load_trend_from_db_async(start, end, bucket),
+        load_rollups_from_db_async('department', bucket, start, end)
+    )
+
+async def _copy_metrics(conn, metrics):
+    """Write health metric rows with asyncpg's COPY, executemany elsewhere"""
+    if conn.dialect.driver == 'asyncpg':
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            'health_metrics',
+            records=list(metrics.itertuples(index=False, name=None)),
+            columns=METRIC_COLUMNS
+        )
+    else:
+        await conn.run_sync(database._write_metrics, metrics)
+
+async def bulk_insert_data_async(data, chunk_size=INGEST_CHUNK_SIZE):
+    """
+    Async version of database.bulk_insert_data
+    
+    Args:
+        data: DataFrame, or iterable of DataFrame chunks
+        chunk_size: Rows per transaction when a single DataFrame is given
+    
+    Returns:
+        Dictionary with ingest statistics, or None if error
+    """
+    stats = {'employees': 0, 'metrics': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+    start_time = time.perf_counter()
+    try:
+        for chunk in database._iter_chunks(data, chunk_size):
+            if chunk.empty:
+                continue
+            chunk = database._prepare_chunk(chunk)
+            
+            async with get_async_engine().begin() as conn:
+                stats['employees'] += await conn.run_sync(database._ingest_chunk, chunk, False)
+                await _copy_metrics(conn, chunk[METRIC_COLUMNS])
+            stats['metrics'] += len(chunk)
+        
+        return database._log_ingest(stats, start_time)
+    
+    except Exception as e:
+        database._known_partitions.clear()
+        logger.error(f"Error bulk inserting data after {stats['metrics']} rows: {e}")
+        return None
@@ -0,0 +1,238 @@
+"""
+Benchmark the dashboard data path from the database to rendered figures
+
+Usage:
+    python -m benchmarks.bench_data_path --sizes 1k,100k
+    python -m benchmarks.bench_data_path --sizes 1k,100k,10m --save-baseline
+
+Each dataset size runs in its own process against its own database: a
+SQLite file under --data-dir by default, or --database-url, where a
+'{size}' placeholder selects one database per size. Generated datasets
+are kept and reused by later runs.
+
+After a warm-up call, the best wall time over --repeat calls and the
+tracemalloc peak of one more call are recorded for every function and compared with the baseline
+file. The run fails when a time or peak memory grows by more than
+--threshold over the baseline and by more than the noise floor.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DATA_DIR = os.path.join(BENCHMARK_DIR, '.data')
+
+# Readings per dataset size as (employees, readings per employee), one per minute
+SIZES = {
+    '1k': (50, 20),
+    '100k': (1_000, 100),
+    '10m': (10_000, 1_000),
+}
+
+# Fixed end of the generated span, so stored datasets can be reused between runs
+DATASET_END = datetime(2025, 1, 6)
+
+# Differences below these are treated as noise whatever the relative change
+MIN_SECONDS_DELTA = 0.01
+MIN_PEAK_MB_DELTA = 1.0
+
+def build_cases(readings, trend):
+    """
+    Return the benchmarked calls as {name: zero-argument function}
+    
+    Args:
+        readings: DataFrame of generated readings with the employee columns
+        trend: Department trend from load_trend_from_db, for plot_stress_trend
+    """
+    import database
+    import utils
+    from alerts import get_summary_metrics
+    from data_processor import load_data, filter_data, get_department_rankings
+    from dataset import WellnessDataset
+    
+    start = DATASET_END - timedelta(days=7)
+    department = utils.DEPARTMENTS[0]
+    dataset = WellnessDataset(readings)
+    
+    def render(build):
+        # st.plotly_chart serialises the figure to JSON, which dominates for big frames
+        return lambda: build().to_json()
+    
+    return {
+        'load_data': load_data.__wrapped__,
+        'load_aggregates_from_db': lambda: database.load_aggregates_from_db(start, DATASET_END),
+        'load_trend_from_db': lambda: database.load_trend_from_db(start, DATASET_END, 'hour'),
+        'filter_data': lambda: filter_data(readings, department),
+        'filter_data_partitioned': lambda: filter_data(dataset, department),
+        'get_summary_metrics': lambda: get_summary_metrics(readings),
+        'get_department_rankings': lambda: get_department_rankings(readings),
+        'plot_department_stress': render(lambda: utils.plot_department_stress(readings)),
+        'plot_stress_trend': render(lambda: utils.plot_stress_trend(trend)),
+        'plot_heart_rate_distribution': render(lambda: utils.plot_heart_rate_distribution(readings)),
+        'plot_spo2_distribution': render(lambda: utils.plot_spo2_distribution(readings)),
+        'plot_mood_distribution': render(lambda: utils.plot_mood_distribution(readings)),
+        'create_department_comparison_chart': render(lambda: utils.create_department_comparison_chart(readings)),
+    }
+
+def prepare_dataset(size):
+    """Load the generated readings for a size into the database unless already there"""
+    import database
+    from utils import generate_time_series
+    
+    n_employees, steps = SIZES[size]
+    expected = n_employees * steps
+    start = DATASET_END - timedelta(minutes=steps)
+    readings = generate_time_series(n_employees, start, DATASET_END, '1min')
+    
+    database.initialize_database()
+    status = database.get_dataset_status()
+    if status is None:
+        raise SystemExit("Could not read the dataset status")
+    if status['metric_count'] == expected:
+        return
+    if status['metric_count']:
+        raise SystemExit(
+            f"{database.get_engine().url} holds {status['metric_count']} readings, "
+            f"expected 0 or {expected}; point the {size} benchmark at an empty database"
+        )
+    if database.bulk_insert_data(readings) is None:
+        raise SystemExit("Loading the benchmark dataset failed")
+
+def measure(function, repeat):
+    """Return the best-of-`repeat` wall time in seconds and the tracemalloc peak in MB"""
+    # Untimed first call, so one-off costs like loading plotly templates are excluded
+    function()
+    
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1024 / 1024
+
+def run_size(size, repeat):
+    """Benchmark one dataset size in this process and return {name: result}"""
+    import pandas as pd
+    import database
+    from utils import generate_time_series
+    
+    prepare_dataset(size)
+    n_employees, steps = SIZES[size]
+    start = DATASET_END - timedelta(minutes=steps)
+    readings = pd.concat(generate_time_series(n_employees, start, DATASET_END, '1min'), ignore_index=True)
+    trend = database.load_trend_from_db(DATASET_END - timedelta(days=7), DATASET_END, 'hour')
+    
+    results = {}
+    for name, function in build_cases(readings, trend).items():
+        seconds, peak_mb = measure(function, repeat)
+        results[name] = {'seconds': seconds, 'peak_mb': peak_mb}
+    return results
+
+def run_size_in_subprocess(size, database_url, repeat):
+    """Run one size in a fresh interpreter so each gets its own engine and memory"""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_data_path', '--worker', size, '--repeat', str(repeat)],
+        env=env, cwd=os.path.dirname(BENCHMARK_DIR), stdout=subprocess.PIPE, check=True
+    )
+    return json.loads(completed.stdout.decode().strip().splitlines()[-1])
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a baseline
+    
+    Returns:
+        List of (size, name, field, baseline, current) regressions
+    """
+    regressions = []
+    for size, cases in results.items():
+        for name, result in cases.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            for field, noise in (('seconds', MIN_SECONDS_DELTA), ('peak_mb', MIN_PEAK_MB_DELTA)):
+                if result[field] > previous[field] * (1 + threshold) and result[field] - previous[field] > noise:
+                    regressions.append((size, name, field, previous[field], result[field]))
+    return regressions
+
+def print_results(size, cases, baseline):
+    print(f"\n{size} readings")
+    print(f"{'function':<38}{'time (s)':>10}{'baseline':>10}{'peak (MB)':>11}{'baseline':>10}")
+    for name, result in cases.items():
+        previous = baseline.get(size, {}).get(name, {})
+        base_seconds = f"{previous['seconds']:.4f}" if previous else '-'
+        base_peak = f"{previous['peak_mb']:.1f}" if previous else '-'
+        print(f"{name:<38}{result['seconds']:>10.4f}{base_seconds:>10}{result['peak_mb']:>11.1f}{base_peak:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1k,100k', help=f"Comma-separated subset of {', '.join(SIZES)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--database-url', help="Database per size, e.g. postgresql:///bench_{size}")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory for the SQLite datasets")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument('--save-baseline', action='store_true', help="Write these results as the new baseline")
+    parser.add_argument('--worker', choices=SIZES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        print(json.dumps(run_size(args.worker, args.repeat)))
+        return
+    
+    sizes = [size.strip().lower() for size in args.sizes.split(',')]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes {unknown}; choose from {', '.join(SIZES)}")
+    
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    
+    results = {}
+    for size in sizes:
+        if args.database_url:
+            database_url = args.database_url.replace('{size}', size)
+        else:
+            os.makedirs(args.data_dir, exist_ok=True)
+            database_url = f"sqlite:///{os.path.join(os.path.abspath(args.data_dir), f'bench_{size}.db')}"
+        results[size] = run_size_in_subprocess(size, database_url, args.repeat)
+        print_results(size, results[size], baseline)
+    
+    if args.save_baseline:
+        merged = dict(baseline, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'machine': platform.node(),
+                'python': platform.python_version(),
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'results': merged,
+            }, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+    
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}:")
+        for size, name, field, previous, current in regressions:
+            print(f"  {size} {name} {field}: {previous:.4f} -> {current:.4f}")
+        sys.exit(1)
+    print("\nNo regressions" if baseline else "\nNo baseline to compare with; run with --save-baseline")
+
+if __name__ == '__main__':
+    main()
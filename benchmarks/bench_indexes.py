@@ -0,0 +1,113 @@
+"""
+Benchmark health_metrics queries before and after the schema migration indexes
+
+Usage:
+    python -m benchmarks.bench_indexes --readings 10000000
+
+Runs against DATABASE_URL when set, otherwise a temporary SQLite file.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')}"
+
+from sqlalchemy import text
+
+import database
+from utils import generate_time_series
+
+INDEXES = [
+    'ix_health_metrics_employee_id_timestamp',
+    'ix_health_metrics_timestamp',
+    'ix_employees_department',
+]
+
+QUERIES = {
+    'latest per employee (self-join)': """
+        WITH latest_metrics AS (
+            SELECT employee_id, MAX(timestamp) AS max_timestamp
+            FROM health_metrics
+            GROUP BY employee_id
+        )
+        SELECT COUNT(*)
+        FROM latest_metrics lm
+        JOIN health_metrics hm
+            ON hm.employee_id = lm.employee_id AND hm.timestamp = lm.max_timestamp
+    """,
+    'employee history (last 100)': """
+        SELECT heart_rate, spo2, stress_score, timestamp
+        FROM health_metrics
+        WHERE employee_id = 'EMP00042'
+        ORDER BY timestamp DESC
+        LIMIT 100
+    """,
+    'last 24h average': """
+        SELECT COUNT(*), AVG(stress_score)
+        FROM health_metrics
+        WHERE timestamp >= :since
+    """,
+    'department last 24h average': """
+        SELECT AVG(hm.stress_score)
+        FROM health_metrics hm
+        JOIN employees e ON e.employee_id = hm.employee_id
+        WHERE e.department = 'Finance' AND hm.timestamp >= :since
+    """,
+}
+
+def generate_readings(n_readings, n_employees, days, chunk_size):
+    """Yield chunks of about n_readings time-series readings covering the last `days` days"""
+    end = datetime.now()
+    interval = timedelta(days=days) * n_employees / n_readings
+    return generate_time_series(n_employees, end - timedelta(days=days), end, interval, chunk_size)
+
+def time_queries(repeat):
+    """Return the best-of-`repeat` wall time in seconds for each query"""
+    since = datetime.now() - timedelta(days=1)
+    timings = {}
+    with database.get_engine().connect() as conn:
+        for name, sql in QUERIES.items():
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(text(sql), {'since': since}).fetchall()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readings', type=int, default=10_000_000)
+    parser.add_argument('--employees', type=int, default=10_000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--chunk-size', type=int, default=database.INGEST_CHUNK_SIZE)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    database.initialize_database()
+    with database.get_engine().begin() as conn:
+        for index in INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    
+    print(f"Loading {args.readings:,} readings for {args.employees:,} employees into {database.get_engine().url}")
+    database.bulk_insert_data(generate_readings(args.readings, args.employees, args.days, args.chunk_size))
+    
+    with database.get_engine().begin() as conn:
+        conn.execute(text("ANALYZE"))
+    before = time_queries(args.repeat)
+    
+    with database.get_engine().begin() as conn:
+        database._migrate_health_metric_indexes(conn)
+        conn.execute(text("ANALYZE"))
+    after = time_queries(args.repeat)
+    
+    print(f"\n{'query':<36}{'before (s)':>12}{'after (s)':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] > 0 else float('inf')
+        print(f"{name:<36}{before[name]:>12.4f}{after[name]:>12.4f}{speedup:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
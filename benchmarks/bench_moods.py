@@ -0,0 +1,62 @@
+"""
+Benchmark vectorized mood classification against the per-row determine_mood
+
+Usage:
+    python -m benchmarks.bench_moods --rows 1000000
+
+Checks that utils.classify_moods returns exactly what determine_mood does,
+including the boundary scores, NaN and infinities, before timing both.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import classify_moods, determine_mood, MOOD_THRESHOLDS
+
+def generate_scores(n_rows, seed=42):
+    """Random stress scores with every boundary, its neighbours and the special values mixed in"""
+    rng = np.random.default_rng(seed)
+    scores = rng.uniform(-10, 110, size=n_rows).round(1)
+    edges = [edge + offset for edge in MOOD_THRESHOLDS for offset in (-0.05, 0, 0.05)]
+    special = np.array(edges + [0, 100, np.nan, np.inf, -np.inf])
+    scores[:len(special)] = special
+    return pd.Series(scores, name='stress_score')
+
+def check_equivalence(scores):
+    """Raise AssertionError if the vectorized and scalar classifiers disagree"""
+    expected = scores.apply(determine_mood)
+    actual = pd.Series(classify_moods(scores), index=scores.index).astype(str)
+    mismatches = scores[expected != actual]
+    assert mismatches.empty, f"classify_moods differs from determine_mood for {mismatches.head().tolist()}"
+
+def best_time(function, repeat):
+    """Return the best-of-`repeat` wall time in seconds for a function call"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    scores = generate_scores(args.rows)
+    check_equivalence(scores)
+    print(f"classify_moods matches determine_mood on {args.rows:,} scores")
+    
+    scalar = best_time(lambda: scores.apply(determine_mood), args.repeat)
+    vectorized = best_time(lambda: classify_moods(scores), args.repeat)
+    
+    print(f"\n{'method':<36}{'time (s)':>12}")
+    print(f"{'Series.apply(determine_mood)':<36}{scalar:>12.4f}")
+    print(f"{'classify_moods':<36}{vectorized:>12.4f}")
+    print(f"speedup: {scalar / vectorized:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Generate a synthetic health metrics dataset for load testing
+
+Usage:
+    python -m benchmarks.generate_dataset --employees 10000 --days 30 --interval 1min --parquet readings.parquet
+    python -m benchmarks.generate_dataset --employees 10000 --days 30 --interval 1min --db
+
+Readings are streamed in chunks from utils.generate_time_series, so the
+full dataset is never held in memory. --db loads them with
+database.bulk_insert_data into DATABASE_URL.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import database
+from utils import generate_time_series
+
+def write_parquet(chunks, path):
+    """Stream DataFrame chunks into one zstd-compressed Parquet file and return the row count"""
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def write_database(chunks):
+    """Load DataFrame chunks into the configured database and return the row count"""
+    if not database.initialize_database():
+        raise SystemExit("Could not initialise the database")
+    stats = database.bulk_insert_data(chunks)
+    if stats is None:
+        raise SystemExit("Bulk insert failed, see the log for details")
+    return stats['metrics']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=10_000)
+    parser.add_argument('--days', type=float, default=30)
+    parser.add_argument('--interval', default='1min', help="Sampling interval, e.g. 30s, 1min, 1h")
+    parser.add_argument('--end', type=pd.Timestamp, default=None,
+                        help="End of the span (exclusive), defaults to now")
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=42)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--parquet', help="Write to this Parquet file")
+    output.add_argument('--db', action='store_true', help="Load into DATABASE_URL")
+    args = parser.parse_args()
+    
+    end = args.end or datetime.now().replace(second=0, microsecond=0)
+    start = end - timedelta(days=args.days)
+    expected = args.employees * int(pd.Timedelta(end - start) / pd.Timedelta(args.interval))
+    print(f"Generating about {expected:,} readings for {args.employees:,} employees from {start} to {end}")
+    
+    chunks = generate_time_series(args.employees, start, end, args.interval, args.chunk_size, args.seed)
+    started = time.perf_counter()
+    rows = write_parquet(chunks, args.parquet) if args.parquet else write_database(chunks)
+    seconds = time.perf_counter() - started
+    print(f"Wrote {rows:,} readings in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+Tiered cache for the dashboard's data loaders
+
+TieredCache keeps recent results in an in-process LRU and writes results
+made of DataFrames to Parquet snapshots on disk, so a restarted server
+starts warm. Entries are keyed by the loader, its arguments and the
+dataset's data_version. Every ingest bumps the version, so a result read
+before an ingest is never served after it, and the first lookup that sees
+a new version drops the older entries from both tiers.
+"""
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cache settings, overridable from the environment; the TTL can also be
+# changed at runtime from the admin panel
+DATA_CACHE_DIR = os.environ.get('DATA_CACHE_DIR', os.path.join('.cache', 'data'))
+DATA_CACHE_TTL_SECONDS = int(os.environ.get('DATA_CACHE_TTL_SECONDS', '300'))
+DATA_CACHE_MAX_ENTRIES = int(os.environ.get('DATA_CACHE_MAX_ENTRIES', '128'))
+
+STAT_FIELDS = ['memory_hits', 'disk_hits', 'misses', 'expirations', 'evictions', 'invalidations', 'disk_errors']
+
+def _to_parts(value):
+    """Split a result into snapshot parts, or return None if it cannot be stored on disk"""
+    values = value if isinstance(value, tuple) else (value,)
+    parts = []
+    for item in values:
+        if isinstance(item, pd.DataFrame):
+            parts.append(item)
+        else:
+            try:
+                json.dumps(item)
+            except (TypeError, ValueError):
+                return None
+            parts.append(item)
+    return parts
+
+class TieredCache:
+    """
+    In-process LRU in front of on-disk Parquet snapshots, keyed by data version
+    
+    Cached results are shared between sessions and must not be modified in
+    place. Results that are not DataFrames, JSON values or tuples of those
+    are kept in memory only.
+    """
+    
+    def __init__(self, version_source, directory=DATA_CACHE_DIR, ttl_seconds=DATA_CACHE_TTL_SECONDS,
+                 max_entries=DATA_CACHE_MAX_ENTRIES):
+        """
+        Create the cache
+        
+        Args:
+            version_source: Function returning the current data version, or
+                None when it cannot be read (lookups then bypass the cache)
+            directory: Directory for the disk snapshots, or None for memory only
+            ttl_seconds: Age after which an entry is reloaded
+            max_entries: Number of entries kept in memory
+        """
+        self.version_source = version_source
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._stats = dict.fromkeys(STAT_FIELDS, 0)
+    
+    def _path(self, namespace, version, digest, suffix):
+        return os.path.join(self.directory, f"{namespace}-v{version}-{digest}{suffix}")
+    
+    def _count(self, field, amount=1):
+        with self._lock:
+            self._stats[field] += amount
+    
+    def _observe_version(self, version):
+        """Drop every entry from older versions the first time a new version is seen"""
+        with self._lock:
+            if version == self._version:
+                return
+            previous, self._version = self._version, version
+            stale = [key for key, entry in self._entries.items() if entry[1] != version]
+            for key in stale:
+                del self._entries[key]
+        if previous is not None:
+            removed = len(set(stale) | self._remove_files(lambda other: other != version))
+            self._count('invalidations', removed)
+            logger.info(f"Data version {previous} -> {version}, dropped {removed} cached results")
+    
+    def _remove_files(self, stale, namespace=None):
+        """Delete the snapshots whose version stale(version) accepts, returning their keys"""
+        removed = set()
+        if not self.directory:
+            return removed
+        for manifest in glob.glob(os.path.join(self.directory, f"{namespace or '*'}-v*-*.json")):
+            name, version, digest = os.path.basename(manifest)[:-len('.json')].rsplit('-', 2)
+            if not version[1:].isdigit() or not stale(int(version[1:])):
+                continue
+            for path in glob.glob(manifest[:-len('.json')] + '*'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            removed.add((name, int(version[1:]), digest))
+        return removed
+    
+    def _read_disk(self, namespace, version, digest, count_expiry=True):
+        """Load a snapshot if it exists and is fresh, or return None"""
+        manifest_path = self._path(namespace, version, digest, '.json')
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache snapshot {manifest_path}: {e}")
+            return None
+        
+        if time.time() - manifest['created'] > self.ttl_seconds:
+            if count_expiry:
+                self._count('expirations')
+            return None
+        
+        try:
+            values = [
+                pd.read_parquet(self._path(namespace, version, digest, f"-{i}.parquet"))
+                if part['kind'] == 'frame' else part['value']
+                for i, part in enumerate(manifest['parts'])
+            ]
+        except (OSError, ValueError) as e:
+            self._count('disk_errors')
+            logger.warning(f"Ignoring unreadable cache snapshot {manifest_path}: {e}")
+            return None
+        value = tuple(values) if manifest['tuple'] else values[0]
+        return manifest['created'], value
+    
+    def _write_disk(self, namespace, version, digest, created, value):
+        """Write a snapshot, parts first and the manifest last so readers never see half of one"""
+        parts = _to_parts(value)
+        if parts is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            manifest = {'created': created, 'tuple': isinstance(value, tuple), 'parts': []}
+            for i, part in enumerate(parts):
+                if isinstance(part, pd.DataFrame):
+                    part.to_parquet(self._path(namespace, version, digest, f"-{i}.parquet"))
+                    manifest['parts'].append({'kind': 'frame'})
+                else:
+                    manifest['parts'].append({'kind': 'value', 'value': part})
+            
+            manifest_path = self._path(namespace, version, digest, '.json')
+            with open(manifest_path + '.tmp', 'w') as f:
+                json.dump(manifest, f)
+            os.replace(manifest_path + '.tmp', manifest_path)
+        except Exception as e:
+            # The memory tier still holds the result
+            self._count('disk_errors')
+            logger.warning(f"Could not write cache snapshot for {namespace}: {e}")
+    
+    def get_or_load(self, namespace, params, load, disk=True):
+        """
+        Return a cached result, loading and storing it on a miss
+        
+        Args:
+            namespace: Name of the cached loader, used in file names and for invalidation
+            params: JSON-serialisable query parameters
+            load: Zero-argument function producing the result
+            disk: Whether to snapshot the result on disk as well
+        
+        Returns:
+            The cached or freshly loaded result
+        """
+        version = self.version_source()
+        if version is None:
+            self._count('misses')
+            return load()
+        self._observe_version(version)
+        
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        key = (namespace, version, digest)
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[2] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return entry[3]
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                expired = True
+        
+        snapshot = None
+        if disk and self.directory:
+            # An entry that expired in memory expires on disk too, so count it once
+            snapshot = self._read_disk(namespace, version, digest, count_expiry=not expired)
+        if snapshot is not None:
+            created, value = snapshot
+            self._count('disk_hits')
+        else:
+            self._count('misses')
+            created, value = now, load()
+            if value is None:
+                return None
+            if disk and self.directory:
+                self._write_disk(namespace, version, digest, created, value)
+        
+        with self._lock:
+            self._entries[key] = (namespace, version, created, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return value
+    
+    def cached(self, namespace=None, disk=True):
+        """
+        Decorate a loader so its results go through the cache
+        
+        Arguments are bound to the loader's signature, so positional and
+        keyword calls share entries. The decorated function keeps the
+        original as __wrapped__ and gains an invalidate() method.
+        
+        Args:
+            namespace: Cache namespace, defaults to the function name
+            disk: Whether to snapshot results on disk as well
+        """
+        def decorator(function):
+            name = namespace or function.__name__
+            signature = inspect.signature(function)
+            
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return self.get_or_load(name, bound.arguments, lambda: function(*args, **kwargs), disk=disk)
+            
+            wrapper.invalidate = lambda: self.invalidate(name)
+            return wrapper
+        return decorator
+    
+    def invalidate(self, namespace=None):
+        """
+        Drop cached results from both tiers
+        
+        Args:
+            namespace: Loader to drop results for, or None for every loader
+        
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = [key for key in self._entries if namespace is None or key[0] == namespace]
+            for key in stale:
+                del self._entries[key]
+        removed = len(set(stale) | self._remove_files(lambda version: True, namespace))
+        self._count('invalidations', removed)
+        return removed
+    
+    def stats(self):
+        """
+        Get hit and miss counters since startup
+        
+        Returns:
+            Dictionary with the STAT_FIELDS counters, hit_rate, memory_entries,
+            data_version and ttl_seconds
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._entries)
+            stats['data_version'] = self._version
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['ttl_seconds'] = self.ttl_seconds
+        return stats
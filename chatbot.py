@@ -1,41 +1,378 @@
+import os
 import re
-import nltk
+import threading
+import weakref
+import numpy as np
 import pandas as pd
 import logging
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+from collections import OrderedDict
+from functools import lru_cache
+from alerts import AlertIndex, HR_ALERT_THRESHOLD, STRESS_ALERT_THRESHOLD, SPO2_ALERT_THRESHOLD
+from dataset import as_dataset
+from entities import get_entity_matcher, normalize
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Download necessary NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-except Exception as e:
-    logger.warning(f"NLTK download error: {e}")
+# NLTK data shipped with the app, searched before NLTK's default locations. Fill it with
+#   python -m nltk.downloader -d nltk_data punkt_tab stopwords wordnet
+NLTK_DATA_DIR = os.environ.get('NLTK_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data'))
 
-# Initialize lemmatizer
-lemmatizer = WordNetLemmatizer()
+# Missing NLTK resources are only downloaded when this is set, so the app never waits on the network
+NLTK_DOWNLOAD = os.environ.get('NLTK_DOWNLOAD', '').lower() in ('1', 'true', 'yes')
+
+# NLTK resources used by preprocess_text as {name: path for nltk.data.find}
+NLTK_RESOURCES = {
+    'punkt_tab': 'tokenizers/punkt_tab/english/',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+
+# Stop words used when the NLTK stopwords corpus is not installed
+FALLBACK_STOPWORDS = frozenset("""
+    a about above after again against all am an and any are as at be because been before being below
+    between both but by can did do does doing down during each few for from further had has have having
+    he her here hers herself him himself his how i if in into is it its itself just me more most my myself
+    no nor not now of off on once only or other our ours ourselves out over own same she should so some
+    such than that the their theirs them themselves then there these they this those through to too under
+    until up very was we were what when where which while who whom why will with you your yours yourself
+    yourselves s t don aren couldn didn doesn hadn hasn haven isn ll m re ve shouldn wasn weren won wouldn
+""".split())
+
+def _fallback_tokenize(text):
+    return re.findall(r"\w+", text)
+
+def _find_nltk_resource(nltk, name, path):
+    """Check for an NLTK resource, downloading it into NLTK_DATA_DIR only if NLTK_DOWNLOAD is set"""
+    try:
+        nltk.data.find(path)
+        return True
+    except LookupError:
+        pass
+    if not NLTK_DOWNLOAD:
+        return False
+    try:
+        nltk.download(name, download_dir=NLTK_DATA_DIR, quiet=True)
+        nltk.data.find(path)
+        return True
+    except Exception as e:
+        logger.warning(f"NLTK download of {name} failed: {e}")
+        return False
+
+@lru_cache(maxsize=None)
+def get_text_tools():
+    """
+    Load the tokenizer, stop words and lemmatizer on first use
+    
+    NLTK is imported here rather than with this module, so it costs nothing
+    until a message is preprocessed. Resources are looked up in
+    NLTK_DATA_DIR and NLTK's own search path, and missing ones are replaced
+    by a regex tokenizer, FALLBACK_STOPWORDS or no lemmatization.
+    
+    Returns:
+        Tuple of (tokenize function, stop word set, lemmatize function)
+    """
+    tokenize, stop_words, lemmatize = _fallback_tokenize, FALLBACK_STOPWORDS, lambda token: token
+    try:
+        import nltk
+    except ImportError:
+        logger.warning("NLTK is not installed, preprocessing messages without it")
+        return tokenize, stop_words, lemmatize
+    
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    available = {name for name, path in NLTK_RESOURCES.items() if _find_nltk_resource(nltk, name, path)}
+    
+    if 'punkt_tab' in available:
+        from nltk.tokenize import word_tokenize
+        tokenize = word_tokenize
+    if 'stopwords' in available:
+        from nltk.corpus import stopwords
+        stop_words = frozenset(stopwords.words('english'))
+    if 'wordnet' in available:
+        from nltk.stem import WordNetLemmatizer
+        lemmatize = WordNetLemmatizer().lemmatize
+    
+    missing = sorted(set(NLTK_RESOURCES) - available)
+    if missing:
+        logger.warning(
+            f"NLTK resources {', '.join(missing)} not found, using fallbacks; install them with "
+            f"python -m nltk.downloader -d {NLTK_DATA_DIR} {' '.join(missing)}"
+        )
+    return tokenize, stop_words, lemmatize
+
+# Number of answers remembered per dataset
+RESPONSE_CACHE_SIZE = 256
+
+# Metrics the assistant can rank and compare, as {column: (label, value name, format)}
+RANKING_METRICS = {
+    'heart_rate': ('heart rate', 'heart rate', '{:.1f} bpm'),
+    'spo2': ('SpO2', 'SpO2', '{:.1f}%'),
+    'stress_score': ('stress level', 'stress score', '{:.1f}/100'),
+    'age': ('age', 'age', '{:.0f}'),
+}
+
+# Words naming each metric in a query
+METRIC_PATTERNS = [
+    (re.compile(r'\bheart ?rates?\b|\bpulse\b|\bbpm\b'), 'heart_rate'),
+    (re.compile(r'\bspo2\b|\boxygen\b'), 'spo2'),
+    (re.compile(r'\bstress'), 'stress_score'),
+    (re.compile(r'\bages?\b|\boldest\b|\byoungest\b'), 'age'),
+]
+
+# Words asking for the top or the bottom of a ranking
+HIGH_WORDS = frozenset(['highest', 'most', 'top', 'max', 'maximum', 'oldest'])
+LOW_WORDS = frozenset(['lowest', 'least', 'bottom', 'min', 'minimum', 'youngest'])
+
+# Number of rows asked for, e.g. 'top 5' or '3 lowest'
+COUNT_PATTERN = re.compile(
+    r'\b(?:top|bottom|highest|lowest|most|least)\s+(\d+)\b|\b(\d+)\s+(?:highest|lowest|most|least)\b'
+)
+
+# Largest ranking the assistant will list
+MAX_RANKED_RESULTS = 20
+
+# Words asking for a ranking of employees or of departments
+EMPLOYEE_WORDS = frozenset(['who', 'whom', 'employee', 'employees', 'people', 'person', 'staff'])
+DEPARTMENT_WORDS = frozenset(['department', 'departments', 'team', 'teams'])
+
+def _format_metric(metric, value):
+    """Format a metric value for a response"""
+    if pd.isna(value):
+        return "no reading"
+    return RANKING_METRICS[metric][2].format(value)
+
+def extreme_positions(values, count, highest=True):
+    """
+    Find the positions of the highest or lowest values with a partial sort
+    
+    np.argpartition selects the count extremes in linear time and only
+    those are sorted, so ranking a few employees out of 100k costs about
+    as much as one pass over the column rather than a full sort.
+    
+    Args:
+        values: 1-D float array; NaN values are never selected
+        count: Number of positions to return
+        highest: Whether to select the highest values rather than the lowest
+    
+    Returns:
+        Array of positions, most extreme first, ties in position order
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    keys = -values[valid] if highest else values[valid]
+    count = min(count, len(keys))
+    if count <= 0:
+        return np.array([], dtype=np.intp)
+    if count < len(keys):
+        selected = np.argpartition(keys, count - 1)[:count]
+    else:
+        selected = np.arange(len(keys))
+    selected = selected[np.lexsort((valid[selected], keys[selected]))]
+    return valid[selected]
+
+class DepartmentAggregates:
+    """
+    Department figures behind the assistant's answers, computed once per dataset
+    
+    Also remembers answers by normalised query and alert thresholds. Every
+    chat session given the same dataset shares one instance, so the cache
+    is effectively keyed by data version as well.
+    """
+    
+    def __init__(self, dataset, alerts=None):
+        """
+        Build the table
+        
+        Args:
+            dataset: WellnessDataset
+            alerts: AlertIndex over dataset.frame to reuse, e.g. the
+                dashboard's; built here if not given
+        """
+        frame = dataset.frame
+        grouped = frame.groupby('department', observed=True)
+        table = grouped.agg(
+            employee_count=('employee_id', 'size'),
+            **{metric: (metric, 'mean') for metric in RANKING_METRICS if metric in frame.columns}
+        )
+        moods = frame.groupby(['department', 'mood'], observed=True).size().unstack(fill_value=0)
+        table['mood'] = moods.idxmax(axis=1)
+        table.index = table.index.astype(str)
+        
+        # Departments ordered by average stress, lowest first
+        self.table = table.sort_values('stress_score', kind='stable')
+        self.alerts = alerts if alerts is not None else AlertIndex(frame)
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def high_stress_count(self, department, thresholds):
+        """Count a department's employees above the stress threshold with a binary search"""
+        return self.alerts.counts(**thresholds, department=department)['high_stress']
+    
+    def response(self, key, answer):
+        """Return the remembered answer for key, or compute it with answer() and remember it"""
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+        response = answer()
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+class EmployeeLookup:
+    """Row positions of employees by upper-case ID and by normalised name, for one dataset"""
+    
+    def __init__(self, dataset):
+        """
+        Build the indexes
+        
+        Args:
+            dataset: WellnessDataset
+        """
+        frame = dataset.frame
+        positions = range(len(frame))
+        # Built from the last row back, so the first row wins when a key repeats
+        ids = [str(employee_id).upper() for employee_id in frame['employee_id'].tolist()]
+        names = [normalize(name) for name in frame['name'].fillna('').tolist()]
+        self.by_id = dict(zip(reversed(ids), reversed(positions)))
+        self.by_name = dict(zip(reversed(names), reversed(positions)))
+
+class EmployeeMetrics:
+    """Float arrays of each employee's ranking metrics, in dataset row order, for one dataset"""
+    
+    def __init__(self, dataset):
+        """
+        Convert the metric columns
+        
+        Args:
+            dataset: WellnessDataset
+        """
+        frame = dataset.frame
+        self.values = {
+            metric: frame[metric].to_numpy(dtype=float, na_value=np.nan)
+            for metric in RANKING_METRICS if metric in frame.columns
+        }
+    
+    def extremes(self, metric, count, highest=True, bounds=None):
+        """
+        Get the row positions of the employees with the highest or lowest values of a metric
+        
+        Args:
+            metric: Column in RANKING_METRICS
+            count: Number of employees
+            highest: Whether to rank from the highest value down
+            bounds: Optional (start, end) row positions to rank within, e.g. a department
+        
+        Returns:
+            Array of row positions in dataset.frame, most extreme first
+        """
+        start, end = bounds if bounds is not None else (0, len(self.values[metric]))
+        return start + extreme_positions(self.values[metric][start:end], count, highest)
+
+# Structures derived from each dataset, kept for as long as the dataset
+_shared = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+
+def _for_dataset(dataset, cls, *args):
+    """Get the cls instance for a dataset, building it with cls(dataset, *args) on first use"""
+    with _shared_lock:
+        structures = _shared.setdefault(dataset, {})
+        if cls not in structures:
+            structures[cls] = cls(dataset, *args)
+        return structures[cls]
+
+def get_department_aggregates(dataset, alerts=None):
+    """
+    Get the DepartmentAggregates for a WellnessDataset, building them on first use
+    
+    Args:
+        dataset: WellnessDataset
+        alerts: AlertIndex over dataset.frame to build them with, so the
+            dashboard and the assistant share one index
+    
+    Returns:
+        DepartmentAggregates shared by every session using dataset
+    """
+    return _for_dataset(dataset, DepartmentAggregates, alerts)
+
+def get_employee_lookup(dataset):
+    """
+    Get the EmployeeLookup for a WellnessDataset, building it on first use
+    
+    Args:
+        dataset: WellnessDataset
+    
+    Returns:
+        EmployeeLookup shared by every session using dataset
+    """
+    return _for_dataset(dataset, EmployeeLookup)
+
+def get_employee_metrics(dataset):
+    """
+    Get the EmployeeMetrics for a WellnessDataset, building them on first use
+    
+    Args:
+        dataset: WellnessDataset
+    
+    Returns:
+        EmployeeMetrics shared by every session using dataset
+    """
+    return _for_dataset(dataset, EmployeeMetrics)
 
 class WellnessChatbot:
-    def __init__(self, employee_data=None):
+    def __init__(self, employee_data=None, alert_index=None):
         """
         Initialize chatbot with employee data
         
         Args:
-            employee_data: DataFrame with employee health metrics
+            employee_data: WellnessDataset or DataFrame with employee health metrics
+            alert_index: Optional AlertIndex already built over the dataset's rows
         """
-        self.data = employee_data
+        self.dataset = None
+        self.data = None
+        self.employees = None
+        self.alert_index = None
+        self.thresholds = {}
         self.chat_history = []
+        self.update_data(employee_data, alert_index=alert_index)
+    
+    def _aggregates(self):
+        """Get the shared DepartmentAggregates for the current dataset, building them on first use"""
+        return get_department_aggregates(self.dataset, self.alert_index)
+    
+    def _alert_thresholds(self):
+        """Return the alert thresholds in use, with the dashboard defaults for any not given"""
+        thresholds = {
+            'hr_threshold': HR_ALERT_THRESHOLD,
+            'stress_threshold': STRESS_ALERT_THRESHOLD,
+            'spo2_threshold': SPO2_ALERT_THRESHOLD
+        }
+        thresholds.update(self.thresholds)
+        return thresholds
     
-    def update_data(self, employee_data):
-        """Update the employee data used by the chatbot"""
-        self.data = employee_data
+    def update_data(self, employee_data, thresholds=None, alert_index=None):
+        """
+        Update the employee data used by the chatbot
+        
+        Args:
+            employee_data: WellnessDataset shared with the dashboard, or a
+                DataFrame with employee health metrics
+            thresholds: Optional alert thresholds (hr_threshold,
+                stress_threshold, spo2_threshold)
+            alert_index: Optional AlertIndex already built over the
+                dataset's rows, reused instead of building another
+        """
+        dataset = as_dataset(employee_data)
+        if dataset is not self.dataset:
+            # A new dataset means a new data version: switch to its shared indexes
+            self.dataset = dataset
+            self.data = dataset.frame if dataset is not None else None
+            self.employees = get_employee_lookup(dataset) if dataset is not None else None
+            self.alert_index = alert_index
+        self.thresholds = thresholds or {}
     
     def preprocess_text(self, text):
         """
@@ -47,75 +384,91 @@ class WellnessChatbot:
         Returns:
             Preprocessed tokens
         """
+        tokenize, stop_words, lemmatize = get_text_tools()
+        
         # Convert to lowercase
         text = text.lower()
         
         # Tokenize
-        tokens = word_tokenize(text)
+        tokens = tokenize(text)
         
         # Remove stopwords and punctuation
-        stop_words = set(stopwords.words('english'))
         tokens = [token for token in tokens if token.isalnum() and token not in stop_words]
         
         # Lemmatize
-        tokens = [lemmatizer.lemmatize(token) for token in tokens]
+        tokens = [lemmatize(token) for token in tokens]
         
         return tokens
     
     def extract_entities(self, text):
         """
-        Extract department or employee names from the query
+        Extract department names, employee names and employee IDs from the query
         
         Args:
             text: User query
             
         Returns:
-            A dictionary with extracted entities
+            A dictionary with extracted entities: every department and
+            employee ID mentioned, in order, under departments and
+            employee_ids, and the first of each under department,
+            employee_id and employee_name
         """
         entities = {}
         entities['department'] = None
         entities['employee_id'] = None
         entities['employee_name'] = None
+        entities['departments'] = []
+        entities['employee_ids'] = []
         entities['query_type'] = None
         entities['intent'] = 'general'  # Default intent
+        lowered = text.lower()
         
         # Check if we have data
-        if self.data is None:
-            return entities
-        
-        # Extract department names
-        departments = self.data['department'].unique()
-        for dept in departments:
-            if dept.lower() in text.lower():
-                entities['department'] = dept
+        if self.data is not None:
+            # Every department, employee ID and employee name mentioned, in
+            # order, from a single pass over the query
+            for kind, value in get_entity_matcher(self.dataset).find(text):
+                if kind == 'department':
+                    entities['departments'].append(value)
+                else:
+                    entities['employee_ids'].append(self.data['employee_id'].iat[value])
+                    if entities['employee_name'] is None:
+                        entities['employee_name'] = self.data['name'].iat[value]
+            
+            if entities['departments']:
+                entities['department'] = entities['departments'][0]
                 entities['query_type'] = 'department'
-                break
-        
-        # Extract employee IDs (format: EMPxxx)
-        emp_id_match = re.search(r'(emp\d{3})', text.lower())
-        if emp_id_match:
-            emp_id = emp_id_match.group(1).upper()
-            if not self.data[self.data['employee_id'] == emp_id].empty:
-                entities['employee_id'] = emp_id
+            if entities['employee_ids']:
+                entities['employee_id'] = entities['employee_ids'][0]
                 entities['query_type'] = 'employee'
         
-        # Extract employee names (e.g., "Employee X")
-        for _, row in self.data.iterrows():
-            if row['name'].lower() in text.lower():
-                entities['employee_name'] = row['name']
-                entities['employee_id'] = row['employee_id']
-                entities['query_type'] = 'employee'
-                break
-        
         # Identify query intent
         mood_keywords = ['mood', 'feeling', 'stress', 'stressed', 'emotion']
         health_keywords = ['health', 'heart rate', 'heartrate', 'spo2', 'oxygen']
         
-        if any(keyword in text.lower() for keyword in mood_keywords):
+        if any(keyword in lowered for keyword in mood_keywords):
             entities['intent'] = 'mood'
-        elif any(keyword in text.lower() for keyword in health_keywords):
+        elif any(keyword in lowered for keyword in health_keywords):
             entities['intent'] = 'health'
         
+        # Metrics mentioned, in order, and any ranking or comparison asked for
+        found = sorted(
+            (match.start(), metric) for pattern, metric in METRIC_PATTERNS
+            for match in [pattern.search(lowered)] if match
+        )
+        entities['metrics'] = [metric for _, metric in found]
+        entities['metric'] = entities['metrics'][0] if found else None
+        
+        entities['direction'] = None
+        for word in re.findall(r'[a-z]+', lowered):
+            if word in HIGH_WORDS or word in LOW_WORDS:
+                entities['direction'] = 'highest' if word in HIGH_WORDS else 'lowest'
+                break
+        
+        count = COUNT_PATTERN.search(lowered)
+        entities['count'] = max(1, min(int(count.group(1) or count.group(2)), MAX_RANKED_RESULTS)) if count else None
+        entities['comparison'] = bool(re.search(r'\bcompare|\bversus\b|\bvs\b', lowered))
+        
         return entities
     
     def get_department_info(self, department_name, intent='general'):
@@ -132,29 +485,25 @@ class WellnessChatbot:
         if self.data is None:
             return "I don't have any employee data to provide information."
         
-        # Filter data for the department
-        dept_data = self.data[self.data['department'] == department_name]
-        
-        if dept_data.empty:
+        # Look the department up in the precomputed table
+        aggregates = self._aggregates()
+        if department_name not in aggregates.table.index:
             return f"I couldn't find any information about the {department_name} department."
         
-        # Calculate department stats
-        avg_heart_rate = dept_data['heart_rate'].mean()
-        avg_spo2 = dept_data['spo2'].mean()
-        avg_stress = dept_data['stress_score'].mean()
-        employee_count = len(dept_data)
-        
-        # Get mood distribution
-        mood_counts = dept_data['mood'].value_counts()
-        most_common_mood = mood_counts.index[0]
+        stats = aggregates.table.loc[department_name]
+        avg_heart_rate = stats['heart_rate']
+        avg_spo2 = stats['spo2']
+        avg_stress = stats['stress_score']
+        employee_count = stats['employee_count']
+        most_common_mood = stats['mood']
         
         if intent == 'mood':
             response = f"In the {department_name} department, the average stress level is {avg_stress:.1f} out of 100. "
             response += f"The most common mood is '{most_common_mood}'. "
             
-            high_stress_count = len(dept_data[dept_data['stress_score'] > 70])
+            high_stress_count = aggregates.high_stress_count(department_name, self._alert_thresholds())
             if high_stress_count > 0:
-                high_stress_percent = (high_stress_count / employee_count) * 100
+                high_stress_percent = high_stress_count / employee_count * 100
                 response += f"{high_stress_count} employees ({high_stress_percent:.1f}%) show high stress levels."
             else:
                 response += "No employees are showing high stress levels at the moment."
@@ -196,19 +545,19 @@ class WellnessChatbot:
         if self.data is None:
             return "I don't have any employee data to provide information."
         
-        # Filter data for the employee
+        # Look the employee up by hash instead of scanning the data
         if employee_id:
-            employee_data = self.data[self.data['employee_id'] == employee_id]
+            position = self.employees.by_id.get(str(employee_id).upper())
         elif employee_name:
-            employee_data = self.data[self.data['name'] == employee_name]
+            position = self.employees.by_name.get(normalize(employee_name))
         else:
             return "I need an employee ID or name to provide information."
         
-        if employee_data.empty:
+        if position is None:
             return "I couldn't find any information about this employee."
         
         # Get employee info
-        employee = employee_data.iloc[0]
+        employee = self.data.iloc[position]
         name = employee['name']
         dept = employee['department']
         heart_rate = employee['heart_rate']
@@ -219,7 +568,7 @@ class WellnessChatbot:
         if intent == 'mood':
             response = f"{name} is currently in a '{mood}' mood with a stress level of {stress:.1f}/100. "
             
-            if stress > 70:
+            if stress > self.thresholds.get('stress_threshold', STRESS_ALERT_THRESHOLD):
                 response += "This is a high stress level. Consider checking in with them."
             elif stress > 50:
                 response += "This is a moderate stress level."
@@ -253,32 +602,198 @@ class WellnessChatbot:
         if self.data is None:
             return "I don't have any employee data to provide information."
         
-        dept_stats = self.data.groupby('department').agg({
-            'employee_id': 'count',
-            'stress_score': 'mean'
-        }).reset_index()
-        
-        dept_stats.columns = ['Department', 'Employee Count', 'Avg Stress']
-        dept_stats = dept_stats.sort_values('Avg Stress', ascending=True)
+        # The table is already ordered by average stress, lowest first
+        dept_stats = self._aggregates().table
         
         response = "Here's a summary of all departments, ordered by stress level (lowest first):\n"
         
-        for _, row in dept_stats.iterrows():
-            response += f"- {row['Department']}: {row['Employee Count']} employees, "
-            response += f"Avg stress: {row['Avg Stress']:.1f}/100\n"
+        for department, employee_count, avg_stress in zip(
+            dept_stats.index, dept_stats['employee_count'], dept_stats['stress_score']
+        ):
+            response += f"- {department}: {employee_count} employees, "
+            response += f"Avg stress: {avg_stress:.1f}/100\n"
+        
+        response += f"\n{dept_stats.index[-1]} shows the highest stress levels, "
+        response += f"while {dept_stats.index[0]} shows the lowest."
+        
+        return response
+    
+    def _describe_employee(self, position):
+        """Name an employee by row position as 'Name (ID, Department)'"""
+        return (
+            f"{self.data['name'].iat[position]} ({self.data['employee_id'].iat[position]}, "
+            f"{self.data['department'].iat[position]})"
+        )
+    
+    def get_employee_ranking(self, metric, highest=True, count=None, department=None):
+        """
+        Get the employees with the highest or lowest values of a metric
+        
+        Args:
+            metric: Column in RANKING_METRICS
+            highest: Whether to rank from the highest value down
+            count: Number of employees to list, or None for just the top one
+            department: Optional department to rank within
+        
+        Returns:
+            Response message
+        """
+        if self.data is None:
+            return "I don't have any employee data to provide information."
+        metrics = get_employee_metrics(self.dataset)
+        label, _, _ = RANKING_METRICS[metric]
+        if metric not in metrics.values:
+            return f"I don't have {label} data for employees."
+        
+        bounds = self.dataset.bounds(department) if department else None
+        positions = metrics.extremes(metric, count or 1, highest, bounds)
+        scope = f" in the {department} department" if department else ""
+        direction = 'highest' if highest else 'lowest'
+        if len(positions) == 0:
+            return f"I don't have any {label} readings{scope}."
+        
+        values = metrics.values[metric]
+        if count is None:
+            position = positions[0]
+            return (
+                f"{self._describe_employee(position)} has the {direction} {label}{scope}: "
+                f"{_format_metric(metric, values[position])}."
+            )
+        
+        noun = 'employees' if len(positions) > 1 else 'employee'
+        response = f"The {len(positions)} {noun} with the {direction} {label}{scope}:"
+        for rank, position in enumerate(positions, 1):
+            response += f"\n{rank}. {self._describe_employee(position)}: {_format_metric(metric, values[position])}"
+        return response
+    
+    def get_department_ranking(self, metric, highest=True, count=None):
+        """
+        Get the departments with the highest or lowest averages of a metric
+        
+        Args:
+            metric: Column in RANKING_METRICS
+            highest: Whether to rank from the highest average down
+            count: Number of departments to list, or None for just the top one
+        
+        Returns:
+            Response message
+        """
+        if self.data is None:
+            return "I don't have any employee data to provide information."
+        dept_stats = self._aggregates().table
+        label, value_name, _ = RANKING_METRICS[metric]
+        if metric not in dept_stats.columns:
+            return f"I don't have {label} data for departments."
+        
+        averages = dept_stats[metric].to_numpy(dtype=float, na_value=np.nan)
+        positions = extreme_positions(averages, count or 1, highest)
+        direction = 'highest' if highest else 'lowest'
+        if len(positions) == 0:
+            return f"I don't have any {label} readings."
+        
+        if count is None:
+            position = positions[0]
+            return (
+                f"The department with the {direction} {label} is {dept_stats.index[position]} "
+                f"with an average {value_name} of {_format_metric(metric, averages[position])}."
+            )
+        
+        noun = 'departments' if len(positions) > 1 else 'department'
+        response = f"The {len(positions)} {noun} with the {direction} average {label}:"
+        for rank, position in enumerate(positions, 1):
+            response += f"\n{rank}. {dept_stats.index[position]}: {_format_metric(metric, averages[position])}"
+        return response
+    
+    def _comparison_summary(self, metrics, names, values):
+        """Sentences naming who is highest and lowest on each metric of a comparison"""
+        response = ""
+        for metric in metrics:
+            label, _, _ = RANKING_METRICS[metric]
+            column = np.asarray(values[metric], dtype=float)
+            if np.isnan(column).all():
+                continue
+            highest = extreme_positions(column, 1, highest=True)[0]
+            lowest = extreme_positions(column, 1, highest=False)[0]
+            response += f"\nHighest {label}: {names[highest]}. Lowest {label}: {names[lowest]}."
+        return response
+    
+    def compare_employees(self, employee_ids, metrics=None):
+        """
+        Compare metrics across several employees
+        
+        Args:
+            employee_ids: IDs of the employees to compare
+            metrics: Columns in RANKING_METRICS to compare, or None for
+                heart rate, SpO2 and stress
         
-        highest_stress = dept_stats.iloc[-1]
-        lowest_stress = dept_stats.iloc[0]
+        Returns:
+            Response message
+        """
+        if self.data is None:
+            return "I don't have any employee data to provide information."
+        employee_metrics = get_employee_metrics(self.dataset)
+        metrics = [
+            metric for metric in (metrics or ['heart_rate', 'spo2', 'stress_score'])
+            if metric in employee_metrics.values
+        ]
+        positions = [self.employees.by_id.get(str(employee_id).upper()) for employee_id in employee_ids]
+        positions = [position for position in positions if position is not None]
+        if len(positions) < 2:
+            return "I need at least two employees I know of to compare."
+        
+        names = [self.data['name'].iat[position] for position in positions]
+        values = {metric: employee_metrics.values[metric][positions] for metric in metrics}
+        response = f"Comparison of {len(positions)} employees:"
+        for i, position in enumerate(positions):
+            figures = ', '.join(
+                f"{RANKING_METRICS[metric][0]} {_format_metric(metric, values[metric][i])}" for metric in metrics
+            )
+            response += f"\n- {self._describe_employee(position)}: {figures}"
+        response += self._comparison_summary(metrics, names, values)
+        return response
+    
+    def compare_departments(self, departments, metrics=None):
+        """
+        Compare average metrics across several departments
         
-        response += f"\n{highest_stress['Department']} shows the highest stress levels, "
-        response += f"while {lowest_stress['Department']} shows the lowest."
+        Args:
+            departments: Names of the departments to compare
+            metrics: Columns in RANKING_METRICS to compare, or None for
+                heart rate, SpO2 and stress
         
+        Returns:
+            Response message
+        """
+        if self.data is None:
+            return "I don't have any employee data to provide information."
+        dept_stats = self._aggregates().table
+        metrics = [
+            metric for metric in (metrics or ['heart_rate', 'spo2', 'stress_score'])
+            if metric in dept_stats.columns
+        ]
+        departments = [department for department in departments if department in dept_stats.index]
+        if len(departments) < 2:
+            return "I need at least two departments I know of to compare."
+        
+        rows = dept_stats.loc[departments]
+        values = {metric: rows[metric].to_numpy(dtype=float, na_value=np.nan) for metric in metrics}
+        response = f"Comparison of {len(departments)} departments:"
+        for i, department in enumerate(departments):
+            figures = ', '.join(
+                f"average {RANKING_METRICS[metric][0]} {_format_metric(metric, values[metric][i])}"
+                for metric in metrics
+            )
+            response += f"\n- {department} ({rows['employee_count'].iloc[i]} employees): {figures}"
+        response += self._comparison_summary(metrics, departments, values)
         return response
     
     def respond(self, query):
         """
         Generate a response to a user query
         
+        Answers are remembered per dataset by normalised query and alert
+        thresholds, so a repeated question is not worked out again.
+        
         Args:
             query: User's question
             
@@ -288,18 +803,40 @@ class WellnessChatbot:
         # Store in chat history
         self.chat_history.append({"user": query})
         
+        query = normalize(query or "")
+        if self.dataset is None:
+            response = self._answer(query)
+        else:
+            key = (query, tuple(sorted(self._alert_thresholds().items())))
+            response = self._aggregates().response(key, lambda: self._answer(query))
+        
+        # Store in chat history
+        self.chat_history.append({"bot": response})
+        return response
+    
+    def _asks_about_one_employee(self, query, entities):
+        """Check whether a query names exactly one employee without asking to rank or compare"""
+        if len(entities['employee_ids']) != 1 or entities['comparison']:
+            return False
+        # Ignore the employee's own name and ID, e.g. the 'employee' in 'Employee 7'
+        employee_id = entities['employee_id']
+        position = self.employees.by_id.get(str(employee_id).upper())
+        rest = query.replace(str(employee_id).lower(), ' ')
+        if position is not None:
+            rest = rest.replace(normalize(self.data['name'].iat[position]), ' ')
+        words = set(re.findall(r'[a-z]+', rest))
+        return not words & (EMPLOYEE_WORDS | DEPARTMENT_WORDS)
+    
+    def _answer(self, query):
+        """Work out the response to a normalised query"""
         # Check for empty query
-        if not query or query.strip() == "":
-            response = "Please ask me a question about employee wellness or department statistics."
-            self.chat_history.append({"bot": response})
-            return response
+        if not query:
+            return "Please ask me a question about employee wellness or department statistics."
         
         # Check for basic greetings
         greetings = ['hi', 'hello', 'hey', 'greetings', 'howdy']
-        if query.lower() in greetings or query.lower().startswith('hi ') or query.lower().startswith('hello '):
-            response = "Hello! I'm the HR Wellness Assistant. How can I help you today?"
-            self.chat_history.append({"bot": response})
-            return response
+        if query in greetings or query.startswith('hi ') or query.startswith('hello '):
+            return "Hello! I'm the HR Wellness Assistant. How can I help you today?"
         
         # Extract entities from the query
         entities = self.extract_entities(query)
@@ -308,9 +845,30 @@ class WellnessChatbot:
         intent = entities.get('intent', 'general')
         
         # Generate response based on query type
-        if "department list" in query.lower() or "all departments" in query.lower():
+        if "department list" in query or "all departments" in query:
             response = self.get_department_summary()
         
+        # Comparisons across several employees or departments
+        elif entities['comparison'] and len(entities['employee_ids']) > 1:
+            response = self.compare_employees(entities['employee_ids'], entities['metrics'])
+        
+        elif entities['comparison'] and len(entities['departments']) > 1:
+            response = self.compare_departments(entities['departments'], entities['metrics'])
+        
+        # Top and bottom rankings by a metric, e.g. 'Who has the highest heart rate?', unless
+        # the query is about one named employee, e.g. "What is EMP001's max heart rate?"
+        elif entities['direction'] and entities['metric'] and not self._asks_about_one_employee(query, entities):
+            highest = entities['direction'] == 'highest'
+            words = set(re.findall(r'[a-z]+', query))
+            if words & DEPARTMENT_WORDS and not entities['departments']:
+                response = self.get_department_ranking(entities['metric'], highest, entities['count'])
+            elif words & EMPLOYEE_WORDS or entities['departments']:
+                response = self.get_employee_ranking(
+                    entities['metric'], highest, entities['count'], entities['department']
+                )
+            else:
+                response = self.get_department_ranking(entities['metric'], highest, entities['count'])
+        
         elif entities['query_type'] == 'department' and entities['department'] is not None:
             response = self.get_department_info(entities['department'], intent)
         
@@ -320,33 +878,14 @@ class WellnessChatbot:
             emp_name = entities['employee_name'] if entities['employee_name'] is not None else ""
             response = self.get_employee_info(emp_id, emp_name, intent)
         
-        # Handle general questions
-        elif any(keyword in query.lower() for keyword in ['highest stress', 'most stressed']):
-            if self.data is None:
-                response = "I don't have any employee data to provide information."
-            else:
-                dept_stats = self.data.groupby('department')['stress_score'].mean().sort_values(ascending=False)
-                highest_dept = dept_stats.index[0]
-                highest_value = dept_stats.iloc[0]
-                response = f"The department with the highest stress level is {highest_dept} with an average stress score of {highest_value:.1f}/100."
-        
-        elif any(keyword in query.lower() for keyword in ['lowest stress', 'least stressed']):
-            if self.data is None:
-                response = "I don't have any employee data to provide information."
-            else:
-                dept_stats = self.data.groupby('department')['stress_score'].mean().sort_values(ascending=True)
-                lowest_dept = dept_stats.index[0]
-                lowest_value = dept_stats.iloc[0]
-                response = f"The department with the lowest stress level is {lowest_dept} with an average stress score of {lowest_value:.1f}/100."
-        
         else:
             # Default response for unrecognized queries
             response = "I'm not sure I understand your question. You can ask me about:"
             response += "\n- A specific department (e.g., 'How is the Engineering department doing?')"
             response += "\n- A specific employee (e.g., 'What's the mood of Employee 5?')"
             response += "\n- Department stress levels (e.g., 'Which department has the highest stress?')"
+            response += "\n- Top or bottom employees by a metric (e.g., 'Who are the top 5 employees by heart rate?')"
+            response += "\n- Comparisons (e.g., 'Compare EMP002 and EMP003' or 'Compare Sales and HR')"
             response += "\n- All departments (e.g., 'Show me all departments')"
         
-        # Store in chat history
-        self.chat_history.append({"bot": response})
-        return response
\ No newline at end of file
+        return response
@@ -1,14 +1,39 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
 import logging
-from utils import generate_demo_data
-from database import load_data_from_db, initialize_database, insert_demo_data, has_data
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from utils import generate_demo_data, classify_moods
+from database import (
+    load_data_from_db, initialize_database, bulk_insert_data, get_dataset_status, get_data_version,
+    load_aggregates_from_db, load_trend_from_db, load_rollups_from_db,
+    ROLLUP_METRICS, ROLLUP_MOODS
+)
+import async_database
+from alerts import AlertIndex
+from cache import TieredCache
+from dataset import WellnessDataset
+from search import EmployeeSearchIndex
+from snapshot import SnapshotService, freeze_frame
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@st.cache_data(ttl=300)  # Cache data for 5 minutes
+_database_initialized = False
+
+def _data_version():
+    """Return the current data version, creating the tables on first use"""
+    global _database_initialized
+    if not _database_initialized:
+        _database_initialized = initialize_database()
+    return get_data_version()
+
+# Loader results shared by every session, keyed by data version and arguments;
+# the admin panel sets its TTL from the Cache Time setting
+data_cache = TieredCache(_data_version)
+
+@data_cache.cached()
 def load_data():
     """
     Load and process the HR wellness data
@@ -20,9 +45,13 @@ def load_data():
     initialize_database()
     
     # Check if we have data in the database
-    if has_data():
+    status = get_dataset_status()
+    if status and status['has_data']:
         # Load data from database
-        logger.info("Loading data from database")
+        logger.info(
+            f"Loading data from database (data version {status['data_version']}, "
+            f"{status['metric_count']} readings up to {status['latest_timestamp']})"
+        )
         db_data = load_data_from_db()
         if db_data is not None and not db_data.empty:
             return db_data
@@ -32,10 +61,215 @@ def load_data():
     df = generate_demo_data(n_employees=50)
     
     # Insert demo data into database
-    insert_demo_data(df)
+    bulk_insert_data(df)
+    
+    return df
+
+def get_time_window(time_range, now=None):
+    """
+    Get the start and end of a sidebar time period
+    
+    Args:
+        time_range: One of 'Today', 'This Week', 'This Month' or 'Quarter'
+        now: End of the window, defaults to the current time
+    
+    Returns:
+        Tuple of (start, end) datetimes
+    """
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    if time_range == 'Today':
+        start = today
+    elif time_range == 'This Week':
+        start = today - timedelta(days=today.weekday())
+    elif time_range == 'This Month':
+        start = today.replace(day=1)
+    elif time_range == 'Quarter':
+        start = today.replace(month=3 * ((today.month - 1) // 3) + 1, day=1)
+    else:
+        raise ValueError(f"Unknown time range: {time_range}")
+    
+    return start, now
+
+@data_cache.cached()
+def load_period_data(time_range):
+    """
+    Load per-employee health metric aggregates for a sidebar time period
+    
+    The heart_rate, spo2 and stress_score columns hold the period means, with
+    _min, _max and _p95 columns alongside, and mood is derived from the mean
+    stress score.
+    
+    Args:
+        time_range: One of 'Today', 'This Week', 'This Month' or 'Quarter'
+    
+    Returns:
+        DataFrame with one row per employee, or None if no readings in the period
+    """
+    start, end = get_time_window(time_range)
+    return _finish_period_data(load_aggregates_from_db(start, end))
+
+def _finish_period_data(df):
+    """Round the period means and derive mood, or return None if there are no readings"""
+    if df is None or df.empty:
+        return None
     
+    means = ['heart_rate', 'spo2', 'stress_score']
+    df[means] = df[means].round(1)
+    df['mood'] = classify_moods(df['stress_score'])
     return df
 
+@data_cache.cached()
+def load_period_trend(time_range):
+    """
+    Load department health metric averages over a sidebar time period
+    
+    Args:
+        time_range: One of 'Today', 'This Week', 'This Month' or 'Quarter'
+    
+    Returns:
+        DataFrame with hourly (Today) or daily averages per department, or None if error
+    """
+    start, end = get_time_window(time_range)
+    return load_trend_from_db(start, end, get_period_bucket(time_range))
+
+def get_period_bucket(time_range):
+    """Return the trend and rollup bucket for a time period: 'hour' for Today, 'day' otherwise"""
+    return 'hour' if time_range == 'Today' else 'day'
+
+def summarize_rollups(rollups, key):
+    """
+    Turn summed rollup aggregates into per-group statistics
+    
+    Args:
+        rollups: DataFrame from load_rollups_from_db
+        key: 'employee_id' or 'department'
+    
+    Returns:
+        DataFrame with mean (under the metric name), std, min and max per
+        metric, the most common mood, and the reading and employee counts
+    """
+    summary = rollups[[key, 'reading_count']].copy()
+    count = rollups['reading_count']
+    for metric in ROLLUP_METRICS:
+        mean = rollups[f'{metric}_sum'] / count
+        variance = (rollups[f'{metric}_sumsq'] / count - mean ** 2).clip(lower=0)
+        summary[metric] = mean
+        summary[f'{metric}_std'] = np.sqrt(variance)
+        summary[f'{metric}_min'] = rollups[f'{metric}_min']
+        summary[f'{metric}_max'] = rollups[f'{metric}_max']
+    
+    mood_counts = rollups[[f'{mood.lower()}_count' for mood in ROLLUP_MOODS]].to_numpy()
+    summary['mood'] = np.array(ROLLUP_MOODS)[mood_counts.argmax(axis=1)]
+    if 'employee_count' in rollups.columns:
+        summary['employee_count'] = rollups['employee_count']
+    return summary
+
+@data_cache.cached()
+def load_rollup_summary(time_range, level='department'):
+    """
+    Answer a sidebar time period from the pre-aggregated rollups
+    
+    Uses hourly buckets for Today and daily buckets otherwise, so the cost
+    depends on the number of buckets rather than the number of readings.
+    
+    Args:
+        time_range: One of 'Today', 'This Week', 'This Month' or 'Quarter'
+        level: 'department' or 'employee'
+    
+    Returns:
+        DataFrame from summarize_rollups, or None if no readings in the period
+    """
+    start, end = get_time_window(time_range)
+    rollups = load_rollups_from_db(level, get_period_bucket(time_range), start, end)
+    if rollups is None or rollups.empty:
+        return None
+    
+    key = 'employee_id' if level == 'employee' else 'department'
+    return summarize_rollups(rollups, key)
+
+@data_cache.cached()
+def load_period_views(time_range):
+    """
+    Load the employee aggregates, department trend and department rollup
+    summary for a sidebar time period in one go
+    
+    The three queries run concurrently on the async engine when its driver
+    (asyncpg or aiosqlite) is installed, and one after another otherwise.
+    
+    Args:
+        time_range: One of 'Today', 'This Week', 'This Month' or 'Quarter'
+    
+    Returns:
+        Tuple of (period data, trend, department summary) as returned by
+        load_period_data, load_period_trend and load_rollup_summary
+    """
+    start, end = get_time_window(time_range)
+    bucket = get_period_bucket(time_range)
+    if async_database.is_available():
+        df, trend_df, rollups = async_database.run(async_database.load_period_views_async(start, end, bucket))
+    else:
+        df = load_aggregates_from_db(start, end)
+        trend_df = load_trend_from_db(start, end, bucket)
+        rollups = load_rollups_from_db('department', bucket, start, end)
+    
+    dept_df = None
+    if rollups is not None and not rollups.empty:
+        dept_df = summarize_rollups(rollups, 'department')
+    return _finish_period_data(df), trend_df, dept_df
+
+@dataclass(frozen=True)
+class DashboardViews:
+    """Data behind the dashboard for one sidebar time period, as returned by get_dashboard_views"""
+    latest: pd.DataFrame
+    period: pd.DataFrame
+    trend: pd.DataFrame
+    departments: pd.DataFrame
+    dataset: WellnessDataset
+    alerts: AlertIndex
+    search: EmployeeSearchIndex
+
+def _build_dashboard_views(time_range):
+    """Load a time period's views, freeze them into Arrow-backed frames and index them"""
+    latest = freeze_frame(load_data())
+    period, trend, departments = (freeze_frame(view) for view in load_period_views(time_range))
+    # Without readings in the period the dashboard shows the latest reading per employee
+    dataset = WellnessDataset(period if period is not None else latest)
+    return DashboardViews(
+        latest=latest, period=period, trend=trend, departments=departments, dataset=dataset,
+        alerts=AlertIndex(dataset.frame), search=EmployeeSearchIndex(dataset.frame)
+    )
+
+# One snapshot per time period for the whole process, rebuilt in the background
+# when the data version changes or it is older than the cache TTL
+dashboard_snapshots = SnapshotService(_build_dashboard_views, _data_version, data_cache.ttl_seconds)
+
+def get_dashboard_views(time_range):
+    """
+    Get the shared snapshot of the dashboard data for a sidebar time period
+    
+    Every session receives the same immutable views, built once per data
+    version, so concurrent viewers add no database load or copies. The
+    frames are Arrow-backed and must not be modified in place.
+    
+    Args:
+        time_range: One of 'Today', 'This Week', 'This Month' or 'Quarter'
+    
+    Returns:
+        DashboardViews with the latest data, period data (None if no
+        readings in the period), trend, department summary, the
+        department-partitioned dataset, and the alert and search indexes
+        over its rows, or None if the data could not be loaded
+    """
+    snapshot = dashboard_snapshots.get(time_range)
+    return snapshot.value if snapshot is not None else None
+
+def set_cache_ttl(seconds):
+    """Set how long loaded data is reused, for both the data cache and the dashboard snapshots"""
+    data_cache.ttl_seconds = seconds
+    dashboard_snapshots.max_age_seconds = seconds
+
 def get_departments(df):
     """
     Get list of unique departments
@@ -55,54 +289,37 @@ def filter_data(df, department=None):
     Filter data based on selected department
     
     Args:
-        df: DataFrame with employee data
+        df: WellnessDataset, whose department slices are positional, or a
+            DataFrame with employee data
         department: Department to filter by
     
     Returns:
         Filtered DataFrame
     """
+    if isinstance(df, WellnessDataset):
+        return df.filter(department)
     if department and department != 'All Departments':
         return df[df['department'] == department]
     return df
 
-def get_summary_metrics(df):
-    """
-    Calculate summary metrics from the data
-    
-    Args:
-        df: DataFrame with employee data
-    
-    Returns:
-        Dictionary of summary metrics
-    """
-    metrics = {
-        'total_employees': len(df),
-        'avg_heart_rate': df['heart_rate'].mean(),
-        'avg_spo2': df['spo2'].mean(),
-        'avg_stress': df['stress_score'].mean(),
-        'high_stress_count': len(df[df['stress_score'] > 70]),
-        'high_stress_percent': len(df[df['stress_score'] > 70]) / len(df) * 100,
-        'department_count': df['department'].nunique()
-    }
-    
-    return metrics
-
 def get_department_rankings(df):
     """
     Rank departments by average stress level
     
     Args:
-        df: DataFrame with employee data
+        df: DataFrame with employee data, or a department rollup summary
+            from load_rollup_summary
     
     Returns:
         DataFrame with department rankings
     """
-    dept_ranks = df.groupby('department').agg({
-        'stress_score': 'mean',
-        'heart_rate': 'mean',
-        'spo2': 'mean',
-        'employee_id': 'count'
-    }).reset_index()
+    count = ('employee_count', 'sum') if 'employee_count' in df.columns else ('employee_id', 'count')
+    dept_ranks = df.groupby('department', observed=True).agg(
+        stress_score=('stress_score', 'mean'),
+        heart_rate=('heart_rate', 'mean'),
+        spo2=('spo2', 'mean'),
+        count=count
+    ).reset_index()
     
     dept_ranks.columns = ['Department', 'Avg Stress', 'Avg HR', 'Avg SpO2', 'Count']
     dept_ranks = dept_ranks.sort_values('Avg Stress', ascending=True)
@@ -1,9 +1,17 @@
+import io
 import os
+import threading
+import time
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import (
+    create_engine, text, func, select, case, Column, Integer, String, Float, DateTime, Text,
+    ForeignKey, Index, Table
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy.pool import QueuePool
+from datetime import datetime, timedelta
 import logging
 
 # Set up logging
@@ -13,15 +21,128 @@ logger = logging.getLogger(__name__)
 # Get database connection string from environment variable
 DATABASE_URL = os.environ.get('DATABASE_URL', '')
 
-# Create SQLAlchemy engine and session
-try:
-    engine = create_engine(DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    Base = declarative_base()
-    logger.info("Database connection established successfully")
-except Exception as e:
-    logger.error(f"Error connecting to database: {e}")
-    raise
+# Number of readings written per transaction by the bulk ingest path
+INGEST_CHUNK_SIZE = 50000
+
+# Employee IDs per IN list when looking up stored employees, within SQLite's bound parameter limit
+EMPLOYEE_LOOKUP_BATCH_SIZE = 10000
+
+EMPLOYEE_COLUMNS = ['employee_id', 'name', 'department', 'age', 'gender']
+METRIC_COLUMNS = ['employee_id', 'heart_rate', 'spo2', 'stress_score', 'mood', 'timestamp']
+
+# Metrics and moods pre-aggregated into the rollup tables
+ROLLUP_METRICS = ['heart_rate', 'spo2', 'stress_score']
+ROLLUP_MOODS = ['Calm', 'Relaxed', 'Moderate', 'Tense', 'Stressed']
+ROLLUP_GRANULARITIES = {'hour': 'h', 'day': 'D'}
+
+# health_metrics is range-partitioned into weekly tables on PostgreSQL
+PARTITION_INTERVAL = timedelta(days=7)
+
+# Readings older than the retention window are moved to Parquet files
+RETENTION_DAYS = int(os.environ.get('HEALTH_METRICS_RETENTION_DAYS', '90'))
+ARCHIVE_DIR = os.environ.get('HEALTH_METRICS_ARCHIVE_DIR', 'archive')
+
+# Connection pool settings, shared by every Streamlit session in the process
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '30000'))
+
+Base = declarative_base()
+Session = sessionmaker()
+
+_engine = None
+_engine_lock = threading.Lock()
+_pool_wait = {'checkouts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+_pool_wait_lock = threading.Lock()
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with _pool_wait_lock:
+                _pool_wait['checkouts'] += 1
+                _pool_wait['total_seconds'] += waited
+                _pool_wait['max_seconds'] = max(_pool_wait['max_seconds'], waited)
+
+def create_db_engine(url=DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                     pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE,
+                     pool_pre_ping=DB_POOL_PRE_PING, statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS):
+    """
+    Create a SQLAlchemy engine with an instrumented connection pool
+    
+    Args:
+        url: Database connection string
+        pool_size: Connections kept open in the pool
+        max_overflow: Extra connections allowed above pool_size under load
+        pool_timeout: Seconds to wait for a free connection before failing
+        pool_recycle: Seconds after which a connection is replaced
+        pool_pre_ping: Test connections for liveness on checkout
+        statement_timeout_ms: PostgreSQL statement timeout (0 disables it)
+    
+    Returns:
+        SQLAlchemy engine
+    """
+    options = {'pool_pre_ping': pool_pre_ping, 'pool_recycle': pool_recycle}
+    connect_args = {}
+    if url.startswith('postgresql') and statement_timeout_ms:
+        connect_args['options'] = f"-c statement_timeout={statement_timeout_ms}"
+    if ':memory:' not in url and url != 'sqlite://':
+        # In-memory SQLite keeps SQLAlchemy's default single-connection pool
+        options.update(
+            poolclass=_TimedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout
+        )
+    return create_engine(url, connect_args=connect_args, **options)
+
+def get_engine():
+    """Return the process-wide engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                try:
+                    _engine = create_db_engine()
+                    Session.configure(bind=_engine)
+                    logger.info("Database connection established successfully")
+                except Exception as e:
+                    logger.error(f"Error connecting to database: {e}")
+                    raise
+    return _engine
+
+def get_pool_status():
+    """
+    Get connection pool usage for the admin panel
+    
+    Returns:
+        Dictionary with pool size, checked-out/idle/overflow connections and
+        checkout wait statistics
+    """
+    pool = get_engine().pool
+    with _pool_wait_lock:
+        wait = dict(_pool_wait)
+    
+    status = {'pool_size': 1, 'checked_out': 0, 'checked_in': 0, 'overflow': 0}
+    if isinstance(pool, QueuePool):
+        status.update(
+            pool_size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0)
+        )
+    status['checkouts'] = wait['checkouts']
+    status['avg_wait_ms'] = wait['total_seconds'] / wait['checkouts'] * 1000 if wait['checkouts'] else 0.0
+    status['max_wait_ms'] = wait['max_seconds'] * 1000
+    return status
 
 # Define database models
 class Employee(Base):
@@ -30,7 +151,7 @@ class Employee(Base):
     id = Column(Integer, primary_key=True)
     employee_id = Column(String(10), unique=True, nullable=False)
     name = Column(String(100), nullable=False)
-    department = Column(String(50), nullable=False)
+    department = Column(String(50), nullable=False, index=True)
     age = Column(Integer)
     gender = Column(String(10))
     
@@ -41,7 +162,11 @@ class HealthMetric(Base):
     __tablename__ = 'health_metrics'
     
     id = Column(Integer, primary_key=True)
-    employee_id = Column(String(10), nullable=False)
+    employee_id = Column(
+        String(10),
+        ForeignKey('employees.employee_id', name='fk_health_metrics_employee_id'),
+        nullable=False
+    )
     heart_rate = Column(Float)
     spo2 = Column(Float)
     stress_score = Column(Float)
@@ -51,16 +176,538 @@ class HealthMetric(Base):
     def __repr__(self):
         return f"<HealthMetric(id={self.id}, employee_id='{self.employee_id}', timestamp='{self.timestamp}')>"
 
+Index('ix_health_metrics_employee_id_timestamp', HealthMetric.employee_id, HealthMetric.timestamp.desc())
+Index('ix_health_metrics_timestamp', HealthMetric.timestamp)
+
+class LatestHealthMetric(Base):
+    """Most recent health metric per employee, maintained on ingest"""
+    __tablename__ = 'latest_health_metrics'
+    
+    employee_id = Column(String(10), primary_key=True)
+    heart_rate = Column(Float)
+    spo2 = Column(Float)
+    stress_score = Column(Float)
+    mood = Column(String(20))
+    timestamp = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<LatestHealthMetric(employee_id='{self.employee_id}', timestamp='{self.timestamp}')>"
+
+def _rollup_table(name, key_column):
+    """
+    Define a rollup table holding additive aggregates per time bucket
+    
+    Each row keeps the reading count and, per metric, the sum, sum of squares,
+    min and max, plus a count per mood, so buckets can be merged on ingest
+    and combined into means and standard deviations over any window.
+    """
+    columns = [
+        Column('granularity', String(5), primary_key=True),
+        Column('bucket_start', DateTime, primary_key=True),
+        key_column,
+        Column('reading_count', Integer, nullable=False),
+    ]
+    for metric in ROLLUP_METRICS:
+        columns += [
+            Column(f'{metric}_sum', Float),
+            Column(f'{metric}_sumsq', Float),
+            Column(f'{metric}_min', Float),
+            Column(f'{metric}_max', Float),
+        ]
+    columns += [Column(f'{mood.lower()}_count', Integer, nullable=False) for mood in ROLLUP_MOODS]
+    return Table(name, Base.metadata, *columns)
+
+employee_rollups = _rollup_table('employee_metric_rollups', Column('employee_id', String(10), primary_key=True))
+department_rollups = _rollup_table('department_metric_rollups', Column('department', String(50), primary_key=True))
+
+class SchemaMigration(Base):
+    """Record of a schema migration applied to the database"""
+    __tablename__ = 'schema_migrations'
+    
+    version = Column(Integer, primary_key=True)
+    description = Column(String(200), nullable=False)
+    applied_at = Column(DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f"<SchemaMigration(version={self.version}, description='{self.description}')>"
+
+class DatasetStatus(Base):
+    """
+    Single-row summary of the stored data, maintained on ingest
+    
+    Lets the app answer "is there data, how much and how fresh" without
+    scanning health_metrics. data_version is bumped on every write so
+    callers can tell when cached results are stale.
+    """
+    __tablename__ = 'dataset_status'
+    
+    id = Column(Integer, primary_key=True)
+    employee_count = Column(Integer, nullable=False, default=0)
+    metric_count = Column(Integer, nullable=False, default=0)
+    latest_timestamp = Column(DateTime)
+    data_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f"<DatasetStatus(metric_count={self.metric_count}, data_version={self.data_version})>"
+
+# Primary key of the only dataset_status row
+DATASET_STATUS_ID = 1
+
+def _migrate_health_metric_indexes(conn):
+    """Add lookup indexes and the employee foreign key to existing tables"""
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_health_metrics_employee_id_timestamp "
+        "ON health_metrics (employee_id, timestamp DESC)"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_health_metrics_timestamp ON health_metrics (timestamp)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_employees_department ON employees (department)"))
+    
+    # SQLite cannot add constraints to an existing table; new SQLite
+    # databases get the foreign key from the model definition instead
+    if conn.dialect.name == 'postgresql':
+        exists = conn.execute(text(
+            "SELECT 1 FROM pg_constraint WHERE conname = 'fk_health_metrics_employee_id'"
+        )).first()
+        if not exists:
+            # NOT VALID enforces the constraint for new rows without a full scan
+            # of the existing history under lock
+            conn.execute(text(
+                "ALTER TABLE health_metrics ADD CONSTRAINT fk_health_metrics_employee_id "
+                "FOREIGN KEY (employee_id) REFERENCES employees (employee_id) NOT VALID"
+            ))
+
+# Partitions already known to exist in this process
+_known_partitions = set()
+
+def _partition_start(timestamp):
+    """Return the start of the weekly partition (Monday 00:00) containing a timestamp"""
+    day = pd.Timestamp(timestamp).to_pydatetime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+def _partition_name(start):
+    return f"health_metrics_p{start:%Y%m%d}"
+
+def ensure_partitions(conn, timestamps):
+    """
+    Create the weekly health_metrics partitions holding a set of timestamps
+    
+    Only the weeks that actually occur are created, so an outlying
+    timestamp adds one partition rather than every week up to it. Only
+    applies to PostgreSQL; SQLite keeps health_metrics as a single table.
+    
+    Args:
+        conn: SQLAlchemy connection inside an open transaction
+        timestamps: Timestamps that must be covered, e.g. a chunk's timestamp column
+    """
+    if conn.dialect.name != 'postgresql':
+        return
+    
+    weeks = pd.Series(pd.to_datetime(timestamps)).dropna().dt.to_period('W').unique()
+    for week in weeks:
+        partition_start = week.start_time.to_pydatetime()
+        name = _partition_name(partition_start)
+        if name not in _known_partitions:
+            partition_end = partition_start + PARTITION_INTERVAL
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF health_metrics "
+                f"FOR VALUES FROM ('{partition_start:%Y-%m-%d}') TO ('{partition_end:%Y-%m-%d}')"
+            ))
+            _known_partitions.add(name)
+
+def _migrate_partition_health_metrics(conn):
+    """Convert health_metrics into a weekly range-partitioned table on PostgreSQL"""
+    if conn.dialect.name != 'postgresql':
+        return
+    
+    partitioned = conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'health_metrics'"
+    )).first()
+    if partitioned:
+        return
+    
+    conn.execute(text("ALTER TABLE health_metrics RENAME TO health_metrics_unpartitioned"))
+    conn.execute(text("ALTER SEQUENCE health_metrics_id_seq RENAME TO health_metrics_unpartitioned_id_seq"))
+    # The partition key has to be part of the primary key
+    conn.execute(text("""
+    CREATE TABLE health_metrics (
+        id BIGSERIAL,
+        employee_id VARCHAR(10) NOT NULL,
+        heart_rate FLOAT,
+        spo2 FLOAT,
+        stress_score FLOAT,
+        mood VARCHAR(20),
+        timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp)
+    """))
+    
+    weeks = conn.execute(text(
+        "SELECT DISTINCT date_trunc('week', timestamp) FROM health_metrics_unpartitioned "
+        "WHERE timestamp IS NOT NULL"
+    )).scalars().all()
+    now = datetime.now()
+    ensure_partitions(conn, list(weeks) + [now, now + PARTITION_INTERVAL])
+    
+    columns = 'id, employee_id, heart_rate, spo2, stress_score, mood, timestamp'
+    conn.execute(text(
+        f"INSERT INTO health_metrics ({columns}) "
+        f"SELECT {columns} FROM health_metrics_unpartitioned WHERE timestamp IS NOT NULL"
+    ))
+    conn.execute(text(
+        "SELECT setval('health_metrics_id_seq', COALESCE((SELECT MAX(id) FROM health_metrics), 0) + 1, false)"
+    ))
+    conn.execute(text("DROP TABLE health_metrics_unpartitioned"))
+    
+    # Indexes on the parent are created on every current and future partition
+    conn.execute(text(
+        "CREATE INDEX ix_health_metrics_employee_id_timestamp "
+        "ON health_metrics (employee_id, timestamp DESC)"
+    ))
+    conn.execute(text("CREATE INDEX ix_health_metrics_timestamp ON health_metrics (timestamp)"))
+    conn.execute(text(
+        "ALTER TABLE health_metrics ADD CONSTRAINT fk_health_metrics_employee_id "
+        "FOREIGN KEY (employee_id) REFERENCES employees (employee_id)"
+    ))
+
+def _rebuild_rollups(conn):
+    """Recompute every rollup bucket from the readings in health_metrics"""
+    for table, key, source in [
+        (employee_rollups, 'employee_id', "health_metrics hm"),
+        (department_rollups, 'department', "health_metrics hm JOIN employees e ON e.employee_id = hm.employee_id"),
+    ]:
+        conn.execute(table.delete())
+        for granularity in ROLLUP_GRANULARITIES:
+            if conn.dialect.name == 'postgresql':
+                bucket_expr = f"date_trunc('{granularity}', hm.timestamp)"
+            else:
+                # Match the format SQLAlchemy uses to store DateTime on SQLite
+                bucket_format = '%Y-%m-%d %H:00:00.000000' if granularity == 'hour' else '%Y-%m-%d 00:00:00.000000'
+                bucket_expr = f"strftime('{bucket_format}', hm.timestamp)"
+            
+            aggregates = ', '.join(
+                f"SUM(hm.{metric}), SUM(hm.{metric} * hm.{metric}), MIN(hm.{metric}), MAX(hm.{metric})"
+                for metric in ROLLUP_METRICS
+            )
+            mood_counts = ', '.join(
+                f"SUM(CASE WHEN hm.mood = '{mood}' THEN 1 ELSE 0 END)" for mood in ROLLUP_MOODS
+            )
+            columns = ', '.join(column.name for column in table.columns)
+            conn.execute(text(f"""
+            INSERT INTO {table.name} ({columns})
+            SELECT
+                '{granularity}',
+                {bucket_expr},
+                {key},
+                COUNT(*),
+                {aggregates},
+                {mood_counts}
+            FROM
+                {source}
+            GROUP BY
+                {bucket_expr}, {key}
+            """))
+
+def _refresh_dataset_status(conn):
+    """Recount employees and health metrics into dataset_status and bump the data version"""
+    status = DatasetStatus.__table__
+    employee_count = conn.execute(select(func.count()).select_from(Employee.__table__)).scalar()
+    metric_count = conn.execute(select(func.count()).select_from(HealthMetric.__table__)).scalar()
+    latest_timestamp = conn.execute(select(func.max(HealthMetric.timestamp))).scalar()
+    values = {
+        'employee_count': employee_count,
+        'metric_count': metric_count,
+        'latest_timestamp': latest_timestamp,
+        'updated_at': datetime.now(),
+    }
+    
+    updated = conn.execute(
+        status.update()
+        .where(status.c.id == DATASET_STATUS_ID)
+        .values(data_version=status.c.data_version + 1, **values)
+    )
+    if updated.rowcount == 0:
+        conn.execute(status.insert().values(id=DATASET_STATUS_ID, data_version=1, **values))
+
+# Ordered schema migrations as (version, description, function)
+MIGRATIONS = [
+    (1, "Add health_metrics indexes and employee foreign key", _migrate_health_metric_indexes),
+    (2, "Partition health_metrics by week", _migrate_partition_health_metrics),
+    (3, "Backfill hourly and daily health metric rollups", _rebuild_rollups),
+    (4, "Backfill dataset status", _refresh_dataset_status),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def apply_migrations():
+    """
+    Apply pending schema migrations in version order
+    
+    Returns:
+        List of migration versions applied by this call
+    """
+    with get_engine().connect() as conn:
+        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+    
+    newly_applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with get_engine().begin() as conn:
+            migrate(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(
+                version=version,
+                description=description,
+                applied_at=datetime.now()
+            ))
+        logger.info(f"Applied schema migration {version}: {description}")
+        newly_applied.append(version)
+    
+    return newly_applied
+
 def initialize_database():
-    """Create all database tables if they don't exist"""
+    """Create all database tables if they don't exist and apply pending migrations"""
     try:
-        Base.metadata.create_all(engine)
+        Base.metadata.create_all(get_engine())
+        apply_migrations()
         logger.info("Database tables created successfully")
         return True
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
         return False
 
+def _iter_chunks(data, chunk_size):
+    """Yield DataFrame chunks from a DataFrame or an iterable of DataFrames"""
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+    else:
+        for chunk in data:
+            yield chunk
+
+def _dialect_insert(conn, table):
+    """Return an INSERT construct that supports ON CONFLICT for the connection's dialect"""
+    if conn.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+def _upsert_employees(conn, chunk):
+    """Insert the employees referenced by a chunk in one statement, returning how many were new"""
+    employees = chunk[EMPLOYEE_COLUMNS].drop_duplicates('employee_id')
+    if employees.empty:
+        return 0
+    
+    stmt = _dialect_insert(conn, Employee.__table__)
+    stmt = stmt.on_conflict_do_nothing(index_elements=['employee_id']).returning(Employee.employee_id)
+    # Missing details become NULL; a NaN age from a partly filled column is not a valid integer
+    records = employees.astype(object).where(employees.notna(), None).to_dict('records')
+    # Only inserted rows are returned, so existing employees are not counted
+    return len(conn.execute(stmt, records).all())
+
+def _write_metrics(conn, metrics):
+    """
+    Write health metric rows using COPY on PostgreSQL, executemany elsewhere
+    
+    Args:
+        conn: SQLAlchemy connection inside an open transaction
+        metrics: DataFrame with METRIC_COLUMNS
+    """
+    if conn.dialect.driver == 'psycopg2':
+        buffer = io.StringIO()
+        metrics.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        columns = ', '.join(f'"{column}"' for column in METRIC_COLUMNS)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY health_metrics ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        conn.execute(HealthMetric.__table__.insert(), metrics.to_dict('records'))
+
+def _update_latest_metrics(conn, metrics):
+    """Upsert the newest reading per employee in a chunk into latest_health_metrics"""
+    latest = metrics.sort_values('timestamp').drop_duplicates('employee_id', keep='last')
+    table = LatestHealthMetric.__table__
+    
+    stmt = _dialect_insert(conn, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['employee_id'],
+        set_={column: stmt.excluded[column] for column in METRIC_COLUMNS if column != 'employee_id'},
+        where=table.c.timestamp <= stmt.excluded.timestamp
+    )
+    conn.execute(stmt, latest.to_dict('records'))
+
+def _rollup_frame(readings, key, granularity):
+    """Aggregate a chunk of readings into rollup rows for one key and granularity"""
+    frame = readings.assign(
+        bucket_start=readings['timestamp'].dt.floor(ROLLUP_GRANULARITIES[granularity]),
+        **{f'{metric}_square': readings[metric] ** 2 for metric in ROLLUP_METRICS}
+    )
+    groups = frame.groupby([key, 'bucket_start'])
+    
+    aggregations = {'reading_count': ('timestamp', 'size')}
+    for metric in ROLLUP_METRICS:
+        aggregations[f'{metric}_sum'] = (metric, 'sum')
+        aggregations[f'{metric}_sumsq'] = (f'{metric}_square', 'sum')
+        aggregations[f'{metric}_min'] = (metric, 'min')
+        aggregations[f'{metric}_max'] = (metric, 'max')
+    rollup = groups.agg(**aggregations)
+    
+    mood_counts = frame.groupby([key, 'bucket_start', 'mood'], observed=True).size().unstack(fill_value=0)
+    for mood in ROLLUP_MOODS:
+        column = mood_counts[mood] if mood in mood_counts.columns else 0
+        rollup[f'{mood.lower()}_count'] = column
+    rollup['granularity'] = granularity
+    return rollup.reset_index()
+
+def _merge_rollups(conn, table, rollup, key):
+    """Upsert rollup rows, adding to any existing bucket"""
+    stmt = _dialect_insert(conn, table)
+    least, greatest = (func.least, func.greatest) if conn.dialect.name == 'postgresql' else (func.min, func.max)
+    
+    merged = {'reading_count': table.c.reading_count + stmt.excluded.reading_count}
+    for metric in ROLLUP_METRICS:
+        for suffix in ('sum', 'sumsq'):
+            column = f'{metric}_{suffix}'
+            merged[column] = table.c[column] + stmt.excluded[column]
+        merged[f'{metric}_min'] = least(table.c[f'{metric}_min'], stmt.excluded[f'{metric}_min'])
+        merged[f'{metric}_max'] = greatest(table.c[f'{metric}_max'], stmt.excluded[f'{metric}_max'])
+    for mood in ROLLUP_MOODS:
+        column = f'{mood.lower()}_count'
+        merged[column] = table.c[column] + stmt.excluded[column]
+    
+    stmt = stmt.on_conflict_do_update(index_elements=['granularity', 'bucket_start', key], set_=merged)
+    conn.execute(stmt, rollup.to_dict('records'))
+
+def _stored_departments(conn, readings):
+    """Map each reading to its employee's department as stored in employees"""
+    employee_ids = readings['employee_id'].unique().tolist()
+    table = Employee.__table__
+    departments = {}
+    for start in range(0, len(employee_ids), EMPLOYEE_LOOKUP_BATCH_SIZE):
+        batch = employee_ids[start:start + EMPLOYEE_LOOKUP_BATCH_SIZE]
+        rows = conn.execute(select(table.c.employee_id, table.c.department).where(table.c.employee_id.in_(batch)))
+        departments.update(rows.all())
+    return readings['employee_id'].map(departments)
+
+def _update_rollups(conn, readings):
+    """
+    Fold a chunk of readings into the hourly and daily employee and department rollups
+    
+    Readings count towards their employee's stored department, which an
+    ingest never changes, rather than the department given with the
+    reading, so the rollups match a rebuild joined on employees.
+    """
+    readings = readings.assign(department=_stored_departments(conn, readings))
+    for granularity in ROLLUP_GRANULARITIES:
+        _merge_rollups(conn, employee_rollups, _rollup_frame(readings, 'employee_id', granularity), 'employee_id')
+        _merge_rollups(conn, department_rollups, _rollup_frame(readings, 'department', granularity), 'department')
+
+def _prepare_chunk(chunk):
+    """Normalise the timestamp column of an ingest chunk"""
+    if 'timestamp' not in chunk.columns:
+        chunk = chunk.rename(columns={'last_updated': 'timestamp'})
+    return chunk.assign(timestamp=pd.to_datetime(chunk['timestamp']))
+
+def _ingest_chunk(conn, chunk, write_metrics=True):
+    """
+    Write one prepared chunk inside an open transaction
+    
+    Args:
+        conn: SQLAlchemy connection inside an open transaction
+        chunk: DataFrame from _prepare_chunk
+        write_metrics: False when the caller copies the health metric rows itself
+    
+    Returns:
+        Number of new employees inserted
+    """
+    ensure_partitions(conn, chunk['timestamp'])
+    employees = _upsert_employees(conn, chunk)
+    if write_metrics:
+        _write_metrics(conn, chunk[METRIC_COLUMNS])
+    _update_latest_metrics(conn, chunk[METRIC_COLUMNS])
+    _update_rollups(conn, chunk)
+    _update_dataset_status(conn, len(chunk), chunk['timestamp'].max().to_pydatetime())
+    return employees
+
+def _update_dataset_status(conn, metrics_added, latest_timestamp=None):
+    """
+    Apply an ingest or archive to dataset_status and bump the data version
+    
+    Args:
+        conn: SQLAlchemy connection inside an open transaction
+        metrics_added: Change in the number of health metric rows (negative when archiving)
+        latest_timestamp: Newest timestamp written, or None if no rows were added
+    """
+    status = DatasetStatus.__table__
+    values = {
+        'employee_count': select(func.count()).select_from(Employee.__table__).scalar_subquery(),
+        'metric_count': status.c.metric_count + metrics_added,
+        'data_version': status.c.data_version + 1,
+        'updated_at': datetime.now(),
+    }
+    if latest_timestamp is not None:
+        values['latest_timestamp'] = case(
+            (status.c.latest_timestamp >= latest_timestamp, status.c.latest_timestamp),
+            else_=latest_timestamp
+        )
+    
+    updated = conn.execute(status.update().where(status.c.id == DATASET_STATUS_ID).values(**values))
+    if updated.rowcount == 0:
+        # Status row missing, e.g. the tables were created without running migrations
+        _refresh_dataset_status(conn)
+
+def _log_ingest(stats, start_time):
+    """Fill in the timing fields of ingest statistics and log the throughput"""
+    stats['seconds'] = time.perf_counter() - start_time
+    if stats['seconds'] > 0:
+        stats['rows_per_second'] = stats['metrics'] / stats['seconds']
+    logger.info(
+        f"Bulk inserted {stats['metrics']} health metrics ({stats['employees']} new employees) "
+        f"in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)"
+    )
+    return stats
+
+def bulk_insert_data(data, chunk_size=INGEST_CHUNK_SIZE):
+    """
+    Bulk load employees and health metrics into the database
+    
+    Each chunk is written in its own transaction: employees with a single
+    upsert, health metrics with COPY (PostgreSQL) or executemany (SQLite),
+    the newest reading per employee into latest_health_metrics, and the
+    hourly and daily rollups.
+    
+    Args:
+        data: DataFrame, or iterable of DataFrame chunks, with employee and
+            metric columns ('last_updated' is accepted for 'timestamp')
+        chunk_size: Rows per transaction when a single DataFrame is given
+    
+    Returns:
+        Dictionary with ingest statistics, or None if error
+    """
+    stats = {'employees': 0, 'metrics': 0, 'seconds': 0.0, 'rows_per_second': 0.0}
+    start_time = time.perf_counter()
+    try:
+        for chunk in _iter_chunks(data, chunk_size):
+            if chunk.empty:
+                continue
+            chunk = _prepare_chunk(chunk)
+            
+            with get_engine().begin() as conn:
+                stats['employees'] += _ingest_chunk(conn, chunk)
+            stats['metrics'] += len(chunk)
+        
+        return _log_ingest(stats, start_time)
+    
+    except Exception as e:
+        # Partitions created in the failed transaction were rolled back
+        _known_partitions.clear()
+        logger.error(f"Error bulk inserting data after {stats['metrics']} rows: {e}")
+        return None
+
 def insert_demo_data(df):
     """
     Insert demo data into the database
@@ -71,92 +718,257 @@ def insert_demo_data(df):
     Returns:
         True if successful, False otherwise
     """
-    session = Session()
+    return bulk_insert_data(df) is not None
+
+def rebuild_latest_metrics():
+    """
+    Rebuild latest_health_metrics from the full health_metrics history
+    
+    Used for backfills and after bulk loads that bypassed bulk_insert_data.
+    
+    Returns:
+        Number of employees in the rebuilt table, or None if error
+    """
+    columns = ', '.join(METRIC_COLUMNS)
     try:
-        # Extract unique employees
-        employees_df = df[['employee_id', 'name', 'department', 'age', 'gender']].drop_duplicates()
-        
-        # Add employees
-        for _, row in employees_df.iterrows():
-            # Check if employee already exists
-            existing_employee = session.query(Employee).filter_by(employee_id=row['employee_id']).first()
-            if not existing_employee:
-                employee = Employee(
-                    employee_id=row['employee_id'],
-                    name=row['name'],
-                    department=row['department'],
-                    age=row['age'],
-                    gender=row['gender']
-                )
-                session.add(employee)
-        
-        # Add health metrics
-        for _, row in df.iterrows():
-            health_metric = HealthMetric(
-                employee_id=row['employee_id'],
-                heart_rate=row['heart_rate'],
-                spo2=row['spo2'],
-                stress_score=row['stress_score'],
-                mood=row['mood'],
-                timestamp=row['last_updated']
-            )
-            session.add(health_metric)
-        
-        session.commit()
-        logger.info(f"Inserted {len(employees_df)} employees and {len(df)} health metrics")
+        with get_engine().begin() as conn:
+            conn.execute(text("DELETE FROM latest_health_metrics"))
+            result = conn.execute(text(f"""
+            INSERT INTO latest_health_metrics ({columns})
+            SELECT {columns}
+            FROM (
+                SELECT
+                    {columns},
+                    ROW_NUMBER() OVER (
+                        PARTITION BY employee_id
+                        ORDER BY timestamp DESC, id DESC
+                    ) AS row_number
+                FROM
+                    health_metrics
+            ) ranked
+            WHERE
+                row_number = 1
+            """))
+        logger.info(f"Rebuilt latest health metrics for {result.rowcount} employees")
+        return result.rowcount
+    
+    except Exception as e:
+        logger.error(f"Error rebuilding latest health metrics: {e}")
+        return None
+
+def rebuild_rollups():
+    """
+    Rebuild the hourly and daily rollup tables from health_metrics
+    
+    Used for backfills; rollups for archived readings are lost.
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        with get_engine().begin() as conn:
+            _rebuild_rollups(conn)
+        logger.info("Rebuilt health metric rollups")
         return True
     
     except Exception as e:
-        if session:
-            session.rollback()
-        logger.error(f"Error inserting demo data: {e}")
+        logger.error(f"Error rebuilding health metric rollups: {e}")
         return False
+
+def _read_rollups(conn, level, granularity, start, end):
+    """Read combined rollup buckets for a time window on an open connection"""
+    table, key = (employee_rollups, 'employee_id') if level == 'employee' else (department_rollups, 'department')
+    in_window = [
+        table.c.granularity == granularity,
+        table.c.bucket_start >= start,
+        table.c.bucket_start < end,
+    ]
+    
+    aggregates = [func.sum(table.c.reading_count).label('reading_count')]
+    for metric in ROLLUP_METRICS:
+        aggregates += [
+            func.sum(table.c[f'{metric}_sum']).label(f'{metric}_sum'),
+            func.sum(table.c[f'{metric}_sumsq']).label(f'{metric}_sumsq'),
+            func.min(table.c[f'{metric}_min']).label(f'{metric}_min'),
+            func.max(table.c[f'{metric}_max']).label(f'{metric}_max'),
+        ]
+    aggregates += [
+        func.sum(table.c[f'{mood.lower()}_count']).label(f'{mood.lower()}_count') for mood in ROLLUP_MOODS
+    ]
+    query = select(table.c[key], *aggregates).where(*in_window).group_by(table.c[key]).order_by(table.c[key])
     
+    df = pd.read_sql(query, conn)
+    if level == 'department' and not df.empty:
+        # Headcount per department from the much smaller employee rollups
+        headcount = (
+            select(Employee.department, func.count(func.distinct(employee_rollups.c.employee_id)).label('employee_count'))
+            .join(Employee.__table__, Employee.employee_id == employee_rollups.c.employee_id)
+            .where(
+                employee_rollups.c.granularity == granularity,
+                employee_rollups.c.bucket_start >= start,
+                employee_rollups.c.bucket_start < end,
+            )
+            .group_by(Employee.department)
+        )
+        df = df.merge(pd.read_sql(headcount, conn), on='department', how='left')
+    return df
+
+def load_rollups_from_db(level, granularity, start, end):
+    """
+    Combine rollup buckets in a time window into one row per employee or department
+    
+    Args:
+        level: 'employee' or 'department'
+        granularity: 'hour' or 'day'
+        start: Start of the window (inclusive, aligned to the granularity)
+        end: End of the window (exclusive)
+    
+    Returns:
+        DataFrame with the key column, reading_count and summed aggregates
+        (the department level also has employee_count), or None if error
+    """
+    try:
+        with get_engine().connect() as conn:
+            return _read_rollups(conn, level, granularity, start, end)
+    
+    except Exception as e:
+        logger.error(f"Error loading {level} rollups from database: {e}")
+        return None
+
+def _archivable_partitions(conn, cutoff):
+    """Return (name, start, end) for every weekly partition that ends before cutoff"""
+    if conn.dialect.name == 'postgresql':
+        names = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'health_metrics'"
+        )).scalars().all()
+        starts = sorted(datetime.strptime(name[len('health_metrics_p'):], '%Y%m%d') for name in names)
+    else:
+        # SQLite has no partitions, so archive the same weekly ranges by timestamp
+        oldest = conn.execute(text("SELECT MIN(timestamp) FROM health_metrics")).scalar()
+        starts = []
+        if oldest is not None:
+            start = _partition_start(oldest)
+            while start + PARTITION_INTERVAL <= cutoff:
+                starts.append(start)
+                start += PARTITION_INTERVAL
+    
+    return [
+        (_partition_name(start), start, start + PARTITION_INTERVAL)
+        for start in starts
+        if start + PARTITION_INTERVAL <= cutoff
+    ]
+
+def _export_parquet(conn, start, end, path):
+    """Stream health metrics in [start, end) to a zstd-compressed Parquet file"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    query = text("SELECT * FROM health_metrics WHERE timestamp >= :start AND timestamp < :end ORDER BY timestamp")
+    writer = None
+    rows = 0
+    try:
+        for chunk in pd.read_sql(query, conn, params={'start': start, 'end': end}, chunksize=INGEST_CHUNK_SIZE):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+            writer.write_table(table)
+            rows += len(chunk)
     finally:
-        if session:
-            session.close()
+        if writer is not None:
+            writer.close()
+    return rows
+
+def archive_health_metrics(retention_days=RETENTION_DAYS, archive_dir=ARCHIVE_DIR):
+    """
+    Move health metrics older than the retention window to Parquet files
+    
+    Whole weeks are archived: on PostgreSQL each expired partition is exported,
+    detached and dropped; on SQLite the matching rows are exported and deleted.
+    latest_health_metrics is left untouched.
+    
+    Args:
+        retention_days: Number of days of readings to keep in the database
+        archive_dir: Directory for the Parquet files
+    
+    Returns:
+        Dictionary with the archived partition count, rows and files, or None if error
+    """
+    cutoff = _partition_start(datetime.now() - timedelta(days=retention_days))
+    summary = {'partitions': 0, 'rows': 0, 'files': []}
+    try:
+        os.makedirs(archive_dir, exist_ok=True)
+        with get_engine().connect() as conn:
+            partitions = _archivable_partitions(conn, cutoff)
+        
+        for name, start, end in partitions:
+            with get_engine().begin() as conn:
+                path = os.path.join(archive_dir, f"{name}_{datetime.now():%Y%m%d%H%M%S}.parquet")
+                rows = _export_parquet(conn, start, end, path)
+                if conn.dialect.name == 'postgresql':
+                    conn.execute(text(f"ALTER TABLE health_metrics DETACH PARTITION {name}"))
+                    conn.execute(text(f"DROP TABLE {name}"))
+                    _known_partitions.discard(name)
+                else:
+                    conn.execute(
+                        text("DELETE FROM health_metrics WHERE timestamp >= :start AND timestamp < :end"),
+                        {'start': start, 'end': end}
+                    )
+                if rows:
+                    _update_dataset_status(conn, -rows)
+            
+            summary['partitions'] += 1
+            summary['rows'] += rows
+            if rows:
+                summary['files'].append(path)
+        
+        logger.info(
+            f"Archived {summary['rows']} health metrics from {summary['partitions']} partitions "
+            f"older than {cutoff:%Y-%m-%d} to {archive_dir}"
+        )
+        return summary
+    
+    except Exception as e:
+        logger.error(f"Error archiving health metrics: {e}")
+        return None
+
+LATEST_METRICS_QUERY = """
+SELECT 
+    e.employee_id,
+    e.name,
+    e.department,
+    e.age,
+    e.gender,
+    lm.heart_rate,
+    lm.spo2,
+    lm.stress_score,
+    lm.mood,
+    lm.timestamp as last_updated
+FROM 
+    employees e
+JOIN 
+    latest_health_metrics lm ON e.employee_id = lm.employee_id
+ORDER BY 
+    e.department, e.name
+"""
 
 def load_data_from_db():
     """
-    Load employee health metrics from the database
+    Load the latest health metrics per employee from the database
+    
+    Reads latest_health_metrics, so the cost scales with the number of
+    employees rather than the length of the readings history.
     
     Returns:
         DataFrame with employee health metrics, or None if error
     """
     try:
-        # Query to join employees and their latest health metrics
-        query = """
-        WITH latest_metrics AS (
-            SELECT 
-                employee_id,
-                MAX(timestamp) as max_timestamp
-            FROM 
-                health_metrics
-            GROUP BY 
-                employee_id
-        )
-        SELECT 
-            e.employee_id,
-            e.name,
-            e.department,
-            e.age,
-            e.gender,
-            hm.heart_rate,
-            hm.spo2,
-            hm.stress_score,
-            hm.mood,
-            hm.timestamp as last_updated
-        FROM 
-            employees e
-        JOIN 
-            latest_metrics lm ON e.employee_id = lm.employee_id
-        JOIN 
-            health_metrics hm ON e.employee_id = hm.employee_id AND lm.max_timestamp = hm.timestamp
-        ORDER BY 
-            e.department, e.name
-        """
-        
-        df = pd.read_sql(query, engine)
+        df = pd.read_sql(LATEST_METRICS_QUERY, get_engine())
+        if df.empty and rebuild_latest_metrics():
+            # Databases populated before latest_health_metrics existed
+            df = pd.read_sql(LATEST_METRICS_QUERY, get_engine())
         logger.info(f"Loaded {len(df)} employee records from database")
         return df
     
@@ -164,16 +976,259 @@ def load_data_from_db():
         logger.error(f"Error loading data from database: {e}")
         return None
 
-def has_data():
-    """Check if the database has any data"""
-    session = Session()
+def load_employees_from_db(employee_ids):
+    """
+    Load the stored employee details for a set of employee IDs
+    
+    Args:
+        employee_ids: Iterable of employee IDs
+    
+    Returns:
+        DataFrame with the employee columns for the IDs that exist, or None if error
+    """
+    employee_ids = list(employee_ids)
     try:
-        employee_count = session.query(Employee).count()
-        metrics_count = session.query(HealthMetric).count()
-        return employee_count > 0 and metrics_count > 0
+        stmt = select(*[Employee.__table__.c[column] for column in EMPLOYEE_COLUMNS])
+        stmt = stmt.where(Employee.employee_id.in_(employee_ids))
+        with get_engine().connect() as conn:
+            return pd.read_sql(stmt, conn)
+    
     except Exception as e:
-        logger.error(f"Error checking database data: {e}")
-        return False
-    finally:
-        if session:
-            session.close()
\ No newline at end of file
+        logger.error(f"Error loading employees from database: {e}")
+        return None
+
+# Health metrics summarised by the time-window queries
+AGGREGATE_METRICS = ['heart_rate', 'spo2', 'stress_score']
+
+def _read_aggregates(conn, start, end):
+    """Read per-employee aggregates for a time window on an open connection"""
+    if conn.dialect.name == 'postgresql':
+        percentiles = ', '.join(
+            f"percentile_disc(0.95) WITHIN GROUP (ORDER BY hm.{metric}) AS {metric}_p95"
+            for metric in AGGREGATE_METRICS
+        )
+        source = "health_metrics hm"
+    else:
+        # SQLite has no ordered-set aggregates: rank each metric with a
+        # window function and keep the value at rank ceil(0.95 * n)
+        percentiles = ', '.join(
+            f"MAX(CASE WHEN hm.{metric}_rank = (95 * hm.reading_count + 99) / 100 "
+            f"THEN hm.{metric} END) AS {metric}_p95"
+            for metric in AGGREGATE_METRICS
+        )
+        ranks = ', '.join(
+            f"ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY {metric}) AS {metric}_rank"
+            for metric in AGGREGATE_METRICS
+        )
+        source = f"""(
+            SELECT
+                *,
+                {ranks},
+                COUNT(*) OVER (PARTITION BY employee_id) AS reading_count
+            FROM
+                health_metrics
+            WHERE
+                timestamp >= :start AND timestamp < :end
+        ) hm"""
+    
+    aggregates = ', '.join(
+        f"AVG(hm.{metric}) AS {metric}, MIN(hm.{metric}) AS {metric}_min, MAX(hm.{metric}) AS {metric}_max"
+        for metric in AGGREGATE_METRICS
+    )
+    query = f"""
+    SELECT 
+        e.employee_id,
+        e.name,
+        e.department,
+        e.age,
+        e.gender,
+        COUNT(*) AS reading_count,
+        {aggregates},
+        {percentiles},
+        MAX(hm.timestamp) AS last_updated
+    FROM 
+        {source}
+    JOIN 
+        employees e ON e.employee_id = hm.employee_id
+    WHERE 
+        hm.timestamp >= :start AND hm.timestamp < :end
+    GROUP BY 
+        e.employee_id, e.name, e.department, e.age, e.gender
+    ORDER BY 
+        e.department, e.name
+    """
+    return pd.read_sql(text(query), conn, params={'start': start, 'end': end}, parse_dates=['last_updated'])
+
+def load_aggregates_from_db(start, end):
+    """
+    Load per-employee health metric aggregates for a time window
+    
+    The mean, min, max and 95th percentile (nearest rank) of heart rate, SpO2
+    and stress score are computed in the database; the mean is returned under
+    the metric's own column name so the result can be used like
+    load_data_from_db().
+    
+    Args:
+        start: Start of the window (inclusive)
+        end: End of the window (exclusive)
+    
+    Returns:
+        DataFrame with one row per employee, or None if error
+    """
+    try:
+        with get_engine().connect() as conn:
+            df = _read_aggregates(conn, start, end)
+        
+        logger.info(f"Loaded aggregates for {len(df)} employees between {start} and {end}")
+        return df
+    
+    except Exception as e:
+        logger.error(f"Error loading aggregates from database: {e}")
+        return None
+
+def _read_trend(conn, start, end, bucket):
+    """Read department averages per time bucket on an open connection"""
+    if conn.dialect.name == 'postgresql':
+        bucket_expr = f"date_trunc('{bucket}', hm.timestamp)"
+    else:
+        bucket_format = '%Y-%m-%d %H:00:00' if bucket == 'hour' else '%Y-%m-%d 00:00:00'
+        bucket_expr = f"strftime('{bucket_format}', hm.timestamp)"
+    
+    means = ', '.join(f"AVG(hm.{metric}) AS {metric}" for metric in AGGREGATE_METRICS)
+    query = f"""
+    SELECT 
+        e.department,
+        {bucket_expr} AS bucket,
+        COUNT(*) AS reading_count,
+        {means}
+    FROM 
+        health_metrics hm
+    JOIN 
+        employees e ON e.employee_id = hm.employee_id
+    WHERE 
+        hm.timestamp >= :start AND hm.timestamp < :end
+    GROUP BY 
+        e.department, {bucket_expr}
+    ORDER BY 
+        bucket, e.department
+    """
+    return pd.read_sql(text(query), conn, params={'start': start, 'end': end}, parse_dates=['bucket'])
+
+def load_trend_from_db(start, end, bucket='day'):
+    """
+    Load average health metrics per department and time bucket
+    
+    Args:
+        start: Start of the window (inclusive)
+        end: End of the window (exclusive)
+        bucket: 'hour' or 'day'
+    
+    Returns:
+        DataFrame with department, bucket, reading_count and metric means, or None if error
+    """
+    if bucket not in ('hour', 'day'):
+        raise ValueError(f"Unsupported trend bucket: {bucket}")
+    
+    try:
+        with get_engine().connect() as conn:
+            return _read_trend(conn, start, end, bucket)
+    
+    except Exception as e:
+        logger.error(f"Error loading metric trend from database: {e}")
+        return None
+
+def _exists(conn, table):
+    """Check whether a table has at least one row without counting it"""
+    return conn.execute(select(select(table).exists())).scalar()
+
+def _read_dataset_status(conn):
+    """Read the dataset status summary on an open connection"""
+    schema_version = conn.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+    row = conn.execute(
+        select(DatasetStatus.__table__).where(DatasetStatus.id == DATASET_STATUS_ID)
+    ).mappings().first()
+    if row is None:
+        return {
+            'has_data': _exists(conn, Employee.__table__) and _exists(conn, HealthMetric.__table__),
+            'employee_count': None,
+            'metric_count': None,
+            'latest_timestamp': None,
+            'schema_version': schema_version,
+            'data_version': 0,
+            'updated_at': None,
+        }
+    
+    return {
+        'has_data': row['employee_count'] > 0 and row['metric_count'] > 0,
+        'employee_count': row['employee_count'],
+        'metric_count': row['metric_count'],
+        'latest_timestamp': row['latest_timestamp'],
+        'schema_version': schema_version,
+        'data_version': row['data_version'],
+        'updated_at': row['updated_at'],
+    }
+
+def get_dataset_status():
+    """
+    Get a summary of the stored data without scanning health_metrics
+    
+    Reads the dataset_status row maintained on ingest. If that row is missing
+    the counts are unknown (None) and has_data falls back to EXISTS checks.
+    
+    Returns:
+        Dictionary with has_data, employee_count, metric_count, latest_timestamp,
+        schema_version, data_version and updated_at, or None if error
+    """
+    try:
+        with get_engine().connect() as conn:
+            return _read_dataset_status(conn)
+    
+    except Exception as e:
+        logger.error(f"Error reading dataset status: {e}")
+        return None
+
+def get_data_version():
+    """
+    Get the current data version with a single-row read
+    
+    Cheap enough to call before every cached lookup, so results cached
+    before an ingest are never served after it.
+    
+    Returns:
+        Data version (0 if the status row is missing), or None if error
+    """
+    try:
+        with get_engine().connect() as conn:
+            version = conn.execute(
+                select(DatasetStatus.data_version).where(DatasetStatus.id == DATASET_STATUS_ID)
+            ).scalar()
+        return version or 0
+    
+    except Exception as e:
+        logger.error(f"Error reading data version: {e}")
+        return None
+
+def has_data():
+    """Check if the database has any data"""
+    status = get_dataset_status()
+    return bool(status and status['has_data'])
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="HR wellness database maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('rebuild-latest', help="Rebuild latest_health_metrics from health_metrics")
+    subparsers.add_parser('rebuild-rollups', help="Rebuild the hourly and daily rollups from health_metrics")
+    archive_parser = subparsers.add_parser('archive', help="Archive readings older than the retention window")
+    archive_parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS)
+    archive_parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    args = parser.parse_args()
+    
+    initialize_database()
+    if args.command == 'rebuild-latest':
+        rebuild_latest_metrics()
+    elif args.command == 'rebuild-rollups':
+        rebuild_rollups()
+    elif args.command == 'archive':
+        archive_health_metrics(args.retention_days, args.archive_dir)
@@ -0,0 +1,104 @@
+"""
+In-memory employee dataset partitioned by department
+
+WellnessDataset keeps the employee rows sorted by department, so each
+department is one contiguous block and selecting it is a positional
+slice instead of a boolean mask over the whole frame. The dashboard and
+the wellness assistant share one instance per loaded dataset.
+"""
+import numpy as np
+import pandas as pd
+
+class WellnessDataset:
+    """
+    Employee rows grouped by department, with department slices by position
+    
+    The department column is stored as a categorical with the departments in
+    sorted order, and rows keep their original order within a department.
+    Slices are views of the shared frame and must not be modified in place.
+    """
+    
+    def __init__(self, df):
+        """
+        Build the dataset
+        
+        Args:
+            df: DataFrame with employee data, including a department column
+        """
+        department = pd.Categorical(df['department'])
+        codes = department.codes
+        # Rows without a department sort after every named one
+        codes = np.where(codes < 0, len(department.categories), codes)
+        order = np.argsort(codes, kind='stable')
+        
+        frame = df.iloc[order].reset_index(drop=True)
+        frame['department'] = department[order]
+        self.frame = frame
+        self.departments = department.categories.tolist()
+        
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(self.departments) + 1))))
+        self._slices = {
+            name: (int(bounds[i]), int(bounds[i + 1])) for i, name in enumerate(self.departments)
+        }
+    
+    def __len__(self):
+        return len(self.frame)
+    
+    def department(self, name):
+        """
+        Get the rows of one department
+        
+        Args:
+            name: Department name
+        
+        Returns:
+            DataFrame slice of the department's rows, empty if it is unknown
+        """
+        start, end = self._slices.get(name, (0, 0))
+        return self.frame.iloc[start:end]
+    
+    def bounds(self, department=None):
+        """
+        Get the row positions of a sidebar department selection
+        
+        Args:
+            department: Department name, or None / 'All Departments' for every row
+        
+        Returns:
+            Tuple of (start, end) row positions in frame
+        """
+        if department and department != 'All Departments':
+            return self._slices.get(department, (0, 0))
+        return 0, len(self.frame)
+    
+    def department_size(self, name):
+        """Get the number of rows in a department without slicing"""
+        start, end = self._slices.get(name, (0, 0))
+        return end - start
+    
+    def filter(self, department=None):
+        """
+        Get the rows for a sidebar department selection
+        
+        Args:
+            department: Department name, or None / 'All Departments' for every row
+        
+        Returns:
+            The whole frame or the department's slice
+        """
+        start, end = self.bounds(department)
+        return self.frame.iloc[start:end]
+
+def as_dataset(data):
+    """
+    Wrap employee data in a WellnessDataset unless it already is one
+    
+    Args:
+        data: WellnessDataset, DataFrame or None
+    
+    Returns:
+        WellnessDataset, or None if data is None
+    """
+    if data is None or isinstance(data, WellnessDataset):
+        return data
+    return WellnessDataset(data)
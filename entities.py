@@ -0,0 +1,140 @@
+"""
+Entity matching for the wellness assistant
+
+EntityMatcher compiles department names, employee names and employee IDs
+into one Aho-Corasick automaton, so every entity mentioned in a message
+is found in a single pass over the message, whatever the headcount. The
+automaton is built once per dataset and shared by every chat session.
+"""
+import threading
+import weakref
+from collections import deque
+
+def normalize(text):
+    """Lower-case text and collapse runs of whitespace, as patterns and messages are matched"""
+    return ' '.join(str(text).lower().split())
+
+class EntityMatcher:
+    """
+    Aho-Corasick automaton over entity names
+    
+    Matches must start and end at word boundaries, so 'Employee 1' is not
+    found inside 'Employee 12' and 'HR' is not found inside 'through'.
+    """
+    
+    def __init__(self, patterns):
+        """
+        Build the automaton
+        
+        Args:
+            patterns: Iterable of (text, value) pairs; several values may
+                share one text, e.g. two employees with the same name
+        """
+        # Trie as parallel lists indexed by node: transitions, failure link,
+        # values ending here and the nearest node on the failure chain with values
+        self._goto = [{}]
+        self._values = [None]
+        for text, value in patterns:
+            text = normalize(text)
+            node = 0
+            for char in text:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._values.append(None)
+                node = next_node
+            if node:
+                if self._values[node] is None:
+                    self._values[node] = (len(text), [])
+                self._values[node][1].append(value)
+        
+        self._fail = [0] * len(self._goto)
+        self._output = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._output[child] = fail if self._values[fail] is not None else self._output[fail]
+    
+    def __len__(self):
+        return len(self._goto)
+    
+    def find(self, text):
+        """
+        Find every entity mentioned in text
+        
+        Overlapping matches are resolved leftmost-longest, so 'Sales
+        Operations' is one match rather than 'Sales' and 'Operations'
+        when both are patterns.
+        
+        Args:
+            text: Message to search
+        
+        Returns:
+            List of values in order of appearance, without repeats
+        """
+        text = normalize(text)
+        matches = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            
+            hit = node if self._values[node] is not None else self._output[node]
+            while hit:
+                length, values = self._values[hit]
+                start = end - length
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    matches.append((start, end, values))
+                hit = self._output[hit]
+        
+        # Leftmost-longest: sort by start, longest first, and skip overlaps
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        found = []
+        covered = 0
+        for start, end, values in matches:
+            if start < covered:
+                continue
+            covered = end
+            for value in values:
+                if value not in found:
+                    found.append(value)
+        return found
+
+_matchers = weakref.WeakKeyDictionary()
+_matchers_lock = threading.Lock()
+
+def get_entity_matcher(dataset):
+    """
+    Get the entity matcher for a WellnessDataset, building it on first use
+    
+    Matchers are kept for as long as their dataset, so every session given
+    the same dataset shares one.
+    
+    Args:
+        dataset: WellnessDataset
+    
+    Returns:
+        EntityMatcher whose values are ('department', name) and
+        ('employee', row position in dataset.frame)
+    """
+    with _matchers_lock:
+        matcher = _matchers.get(dataset)
+        if matcher is None:
+            frame = dataset.frame
+            positions = range(len(frame))
+            patterns = [(name, ('department', name)) for name in dataset.departments]
+            patterns += zip(frame['employee_id'].tolist(), (('employee', i) for i in positions))
+            patterns += zip(frame['name'].fillna('').tolist(), (('employee', i) for i in positions))
+            matcher = EntityMatcher(patterns)
+            _matchers[dataset] = matcher
+        return matcher
@@ -0,0 +1,442 @@
+"""
+Sensor ingestion service for the HR wellness database
+
+Accepts health readings over HTTP, validates them, buffers them into
+micro-batches and bulk-writes each batch with database.bulk_insert_data.
+
+Usage:
+    python ingest_service.py --port 8765 --batch-size 1000 --max-wait 1.0
+
+Endpoints:
+    POST /readings  JSON reading or list of readings, answered with 202,
+                    400 if none are valid, 413 if too large, or 503 when
+                    the buffer is full (retry after the Retry-After delay)
+    GET  /stats     Throughput counters as JSON
+    GET  /health    Liveness check
+
+A reading needs employee_id, heart_rate and spo2, and may carry timestamp
+(ISO 8601 or epoch seconds, default now), name, department, age and gender.
+Timestamps older than the retention period or more than
+INGEST_MAX_CLOCK_SKEW_SECONDS in the future are rejected.
+Readings without employee details are matched to stored employees.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+from utils import calculate_stress_score, classify_moods
+from database import (
+    initialize_database, bulk_insert_data, load_employees_from_db, EMPLOYEE_COLUMNS, RETENTION_DAYS
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Service settings, overridable from the environment or the command line
+INGEST_HOST = os.environ.get('INGEST_HOST', '127.0.0.1')
+INGEST_PORT = int(os.environ.get('INGEST_PORT', '8765'))
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', '1000'))
+INGEST_MAX_WAIT_SECONDS = float(os.environ.get('INGEST_MAX_WAIT_SECONDS', '1.0'))
+INGEST_MAX_PENDING = int(os.environ.get('INGEST_MAX_PENDING', '50000'))
+INGEST_MAX_REQUEST_BYTES = int(os.environ.get('INGEST_MAX_REQUEST_BYTES', str(4 * 1024 * 1024)))
+INGEST_RETRY_AFTER_SECONDS = 1
+
+# How far ahead of the server clock a reading may be stamped; a reading from a device
+# with a clock set in the future would otherwise stay the employee's latest until then
+INGEST_MAX_CLOCK_SKEW_SECONDS = int(os.environ.get('INGEST_MAX_CLOCK_SKEW_SECONDS', '300'))
+
+# Physiologically plausible sensor ranges; anything outside is a bad reading
+HEART_RATE_RANGE = (30, 220)
+SPO2_RANGE = (50, 100)
+
+# Maximum lengths of the optional employee fields, matching the employees table
+EMPLOYEE_FIELD_LENGTHS = {'employee_id': 10, 'name': 100, 'department': 50, 'gender': 10}
+
+def _number(reading, field, valid_range):
+    """Return a numeric reading field, raising ValueError if missing or out of range"""
+    value = reading.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{field} must be a number")
+    if not valid_range[0] <= value <= valid_range[1]:
+        raise ValueError(f"{field} must be between {valid_range[0]} and {valid_range[1]}")
+    return float(value)
+
+def _text(reading, field, required=False):
+    """Return a string reading field, raising ValueError if invalid"""
+    value = reading.get(field)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{field} must be a non-empty string")
+    if len(value) > EMPLOYEE_FIELD_LENGTHS[field]:
+        raise ValueError(f"{field} must be at most {EMPLOYEE_FIELD_LENGTHS[field]} characters")
+    return value.strip()
+
+def _timestamp(value):
+    """Parse an ISO 8601 or epoch timestamp into a naive local datetime"""
+    if value is None:
+        return datetime.now()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value)
+    if isinstance(value, str):
+        timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if timestamp.tzinfo is not None:
+            # Stored timestamps are naive local time, like datetime.now()
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        return timestamp
+    raise ValueError("timestamp must be an ISO 8601 string or epoch seconds")
+
+def validate_reading(reading):
+    """
+    Validate and normalise one incoming sensor reading
+    
+    Args:
+        reading: Dictionary decoded from the request body
+    
+    Returns:
+        Dictionary with the employee and metric columns (missing employee
+        details are None) and 'timestamp'
+    
+    Raises:
+        ValueError: If the reading is malformed or out of range, including
+            a timestamp outside the retention period or in the future
+    """
+    if not isinstance(reading, dict):
+        raise ValueError("reading must be a JSON object")
+    
+    age = reading.get('age')
+    if age is not None and (isinstance(age, bool) or not isinstance(age, int) or not 0 < age < 120):
+        raise ValueError("age must be an integer between 1 and 119")
+    
+    try:
+        timestamp = _timestamp(reading.get('timestamp'))
+    except (ValueError, OverflowError, OSError):
+        raise ValueError("timestamp must be an ISO 8601 string or epoch seconds")
+    
+    now = datetime.now()
+    if timestamp > now + timedelta(seconds=INGEST_MAX_CLOCK_SKEW_SECONDS):
+        raise ValueError(f"timestamp must not be more than {INGEST_MAX_CLOCK_SKEW_SECONDS} seconds in the future")
+    if timestamp < now - timedelta(days=RETENTION_DAYS):
+        raise ValueError(f"timestamp must be within the last {RETENTION_DAYS} days")
+    
+    return {
+        'employee_id': _text(reading, 'employee_id', required=True),
+        'name': _text(reading, 'name'),
+        'department': _text(reading, 'department'),
+        'age': age,
+        'gender': _text(reading, 'gender'),
+        'heart_rate': _number(reading, 'heart_rate', HEART_RATE_RANGE),
+        'spo2': _number(reading, 'spo2', SPO2_RANGE),
+        'timestamp': timestamp,
+    }
+
+class IngestStats:
+    """Thread-safe throughput counters for the ingestion service"""
+    
+    COUNTERS = ['received', 'accepted', 'invalid', 'rejected_backpressure', 'unknown_employee',
+                'written', 'failed', 'batches']
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.COUNTERS, 0)
+        self._write_seconds = 0.0
+        self._started = time.monotonic()
+        self._last_batch = None
+    
+    def add(self, **counts):
+        """Increment one or more counters"""
+        with self._lock:
+            for name, value in counts.items():
+                self._counts[name] += value
+    
+    def record_batch(self, rows, seconds):
+        """Record a successfully written batch"""
+        with self._lock:
+            self._counts['written'] += rows
+            self._counts['batches'] += 1
+            self._write_seconds += seconds
+            self._last_batch = {
+                'rows': rows,
+                'seconds': round(seconds, 4),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+            }
+    
+    def snapshot(self, pending=0):
+        """
+        Get the current counters
+        
+        Args:
+            pending: Number of readings waiting in the buffer
+        
+        Returns:
+            Dictionary of counters plus uptime, buffer depth and throughput
+        """
+        with self._lock:
+            snapshot = dict(self._counts)
+            uptime = time.monotonic() - self._started
+            snapshot['pending'] = pending
+            snapshot['uptime_seconds'] = round(uptime, 1)
+            snapshot['rows_per_second'] = round(snapshot['written'] / uptime, 1) if uptime > 0 else 0.0
+            snapshot['write_rows_per_second'] = (
+                round(snapshot['written'] / self._write_seconds, 1) if self._write_seconds > 0 else 0.0
+            )
+            snapshot['last_batch'] = self._last_batch
+        return snapshot
+
+class MicroBatcher:
+    """
+    Buffer validated readings and write them to the database in micro-batches
+    
+    A batch is written once it reaches batch_size readings or once its oldest
+    reading has waited max_wait seconds, whichever comes first. submit()
+    refuses readings when max_pending are already buffered, which the HTTP
+    layer turns into a 503 so senders back off while the database catches up.
+    """
+    
+    def __init__(self, batch_size=INGEST_BATCH_SIZE, max_wait=INGEST_MAX_WAIT_SECONDS,
+                 max_pending=INGEST_MAX_PENDING):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.stats = IngestStats()
+        self._pending = deque()
+        self._oldest = None
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._employees = {}
+        self._thread = threading.Thread(target=self._run, name='ingest-writer', daemon=True)
+    
+    @property
+    def pending(self):
+        """Number of readings waiting to be written"""
+        return len(self._pending)
+    
+    def start(self):
+        """Start the background writer thread"""
+        self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Stop accepting readings, flush the buffer and wait for the writer to finish"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+    
+    def submit(self, readings):
+        """
+        Buffer validated readings for the next batch
+        
+        Args:
+            readings: List of dictionaries from validate_reading
+        
+        Returns:
+            True if the readings were buffered, False if the buffer is full
+        """
+        with self._condition:
+            if self._stopping or len(self._pending) + len(readings) > self.max_pending:
+                self.stats.add(rejected_backpressure=len(readings))
+                return False
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.extend(readings)
+            self.stats.add(accepted=len(readings))
+            self._condition.notify()
+        return True
+    
+    def _next_batch(self):
+        """Wait until a batch is due and take it off the buffer"""
+        with self._condition:
+            while not self._pending and not self._stopping:
+                self._condition.wait()
+            while len(self._pending) < self.batch_size and not self._stopping:
+                remaining = self._oldest + self.max_wait - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            self._oldest = time.monotonic() if self._pending else None
+            return batch
+    
+    def _run(self):
+        """Writer loop: drain batches until stopped and the buffer is empty"""
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stopping:
+                break
+    
+    def _fill_employee_details(self, df):
+        """
+        Fill missing name and department from stored employees
+        
+        Returns:
+            DataFrame without the readings of employees that are still unknown
+        """
+        known = df.dropna(subset=['name', 'department'])
+        for record in known[EMPLOYEE_COLUMNS].drop_duplicates('employee_id').to_dict('records'):
+            self._employees[record['employee_id']] = record
+        
+        missing = df['name'].isna() | df['department'].isna()
+        if not missing.any():
+            return df
+        
+        employee_ids = df.loc[missing, 'employee_id'].unique()
+        lookup = [employee_id for employee_id in employee_ids if employee_id not in self._employees]
+        if lookup:
+            stored = load_employees_from_db(lookup)
+            if stored is not None:
+                for record in stored.to_dict('records'):
+                    self._employees[record['employee_id']] = record
+        
+        details = pd.DataFrame(
+            [self._employees[employee_id] for employee_id in employee_ids if employee_id in self._employees],
+            columns=EMPLOYEE_COLUMNS
+        ).set_index('employee_id')
+        for column in ['name', 'department', 'age', 'gender']:
+            given = df.loc[missing, column]
+            df.loc[missing, column] = given.where(given.notna(), df.loc[missing, 'employee_id'].map(details[column]))
+        
+        unknown = df['name'].isna() | df['department'].isna()
+        if unknown.any():
+            self.stats.add(unknown_employee=int(unknown.sum()))
+            logger.warning(f"Dropped {int(unknown.sum())} readings from unknown employees")
+        return df[~unknown]
+    
+    def _write(self, batch):
+        """Compute stress and mood for a batch and bulk-write it"""
+        df = self._fill_employee_details(pd.DataFrame(batch))
+        if df.empty:
+            return
+        
+        df['stress_score'] = calculate_stress_score(df['heart_rate'], df['spo2']).clip(0, 100)
+        df['mood'] = classify_moods(df['stress_score'])
+        
+        start = time.perf_counter()
+        if bulk_insert_data(df, chunk_size=len(df)) is None:
+            self.stats.add(failed=len(df))
+            return
+        self.stats.record_batch(len(df), time.perf_counter() - start)
+
+class IngestRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of the ingestion service"""
+    
+    batcher = None
+    
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send_json(200, self.batcher.stats.snapshot(self.batcher.pending))
+        else:
+            self._send_json(404, {'error': 'not found'})
+    
+    def do_POST(self):
+        if self.path != '/readings':
+            self._send_json(404, {'error': 'not found'})
+            return
+        
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > INGEST_MAX_REQUEST_BYTES:
+            self._send_json(413, {'error': f"request body exceeds {INGEST_MAX_REQUEST_BYTES} bytes"})
+            return
+        
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send_json(400, {'error': 'request body must be JSON'})
+            return
+        
+        readings = payload if isinstance(payload, list) else [payload]
+        self.batcher.stats.add(received=len(readings))
+        if len(readings) > self.batcher.max_pending:
+            self._send_json(413, {'error': f"at most {self.batcher.max_pending} readings per request"})
+            return
+        
+        valid, errors = [], []
+        for index, reading in enumerate(readings):
+            try:
+                valid.append(validate_reading(reading))
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+        self.batcher.stats.add(invalid=len(errors))
+        
+        if not valid:
+            self._send_json(400, {'accepted': 0, 'errors': errors})
+        elif not self.batcher.submit(valid):
+            self._send_json(
+                503,
+                {'error': 'ingest buffer full, retry later', 'pending': self.batcher.pending},
+                headers={'Retry-After': str(INGEST_RETRY_AFTER_SECONDS)}
+            )
+        else:
+            self._send_json(202, {'accepted': len(valid), 'errors': errors})
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+def create_server(batcher, host=INGEST_HOST, port=INGEST_PORT):
+    """
+    Create the HTTP server for a batcher
+    
+    Args:
+        batcher: MicroBatcher that receives the validated readings
+        host: Interface to listen on
+        port: Port to listen on, 0 for any free port
+    
+    Returns:
+        ThreadingHTTPServer, not yet serving
+    """
+    handler = type('BoundIngestRequestHandler', (IngestRequestHandler,), {'batcher': batcher})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="HR wellness sensor ingestion service")
+    parser.add_argument('--host', default=INGEST_HOST)
+    parser.add_argument('--port', type=int, default=INGEST_PORT)
+    parser.add_argument('--batch-size', type=int, default=INGEST_BATCH_SIZE,
+                        help="Readings per database write")
+    parser.add_argument('--max-wait', type=float, default=INGEST_MAX_WAIT_SECONDS,
+                        help="Seconds a reading may wait before a partial batch is written")
+    parser.add_argument('--max-pending', type=int, default=INGEST_MAX_PENDING,
+                        help="Buffered readings before requests are refused with 503")
+    args = parser.parse_args()
+    
+    if not initialize_database():
+        raise SystemExit("Could not initialise the database")
+    
+    batcher = MicroBatcher(args.batch_size, args.max_wait, args.max_pending)
+    batcher.start()
+    server = create_server(batcher, args.host, args.port)
+    logger.info(f"Ingestion service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(f"Flushing {batcher.pending} buffered readings")
+        batcher.stop()
+        logger.info(f"Ingestion service stopped: {batcher.stats.snapshot()}")
+
+if __name__ == '__main__':
+    main()
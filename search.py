@@ -0,0 +1,210 @@
+"""
+Employee search for the Employee List tab
+
+EmployeeSearchIndex is built once per loaded dataset and answers the
+search box without scanning every row:
+
+- Employee IDs are kept sorted, which serves as a flattened prefix trie:
+  a prefix selects one contiguous range, found with np.searchsorted.
+- Name words are kept sorted the same way for word-prefix matches.
+- Trigrams of each employee's ID and name map to the employees holding
+  them. Substring queries intersect these lists before checking the few
+  candidates left, and fuzzy queries rank employees by shared trigrams.
+
+Results are ranked exact ID, ID prefix, name word prefix and substring
+matches, with ties broken by employee ID. Fuzzy matches are only
+offered when none of those match, e.g. for a misspelt name.
+"""
+import numpy as np
+
+# Number of results returned unless a limit is given
+DEFAULT_RESULT_LIMIT = 100
+
+# Minimum share of the query's trigrams an employee must have for a fuzzy match
+FUZZY_MIN_SIMILARITY = 0.5
+
+# Queries shorter than a trigram are matched by checking rows in order
+MIN_TRIGRAM_QUERY_LENGTH = 3
+
+# Candidates are checked in blocks of this size, so a search stops early once
+# it has enough results
+CHECK_BLOCK_SIZE = 1024
+
+def _pad(text):
+    return f"  {text} "
+
+def _code_points(text):
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+def _trigram_keys(codes):
+    """Pack every run of three code points into one integer key"""
+    return (codes[:-2] << np.uint64(42)) | (codes[1:-1] << np.uint64(21)) | codes[2:]
+
+def _prefix_range(sorted_values, prefix):
+    """Return the (start, end) range of a sorted string array starting with prefix"""
+    # A key longer than the array's string width would make numpy copy the
+    # whole array to a wider dtype, and can match nothing anyway
+    if len(prefix) > sorted_values.dtype.itemsize // 4:
+        return 0, 0
+    # The smallest string above every one starting with prefix, of the same length
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return np.searchsorted(sorted_values, prefix, side='left'), np.searchsorted(sorted_values, upper, side='left')
+
+def _intersect(small, large):
+    """Intersect two sorted arrays of unique documents with a binary search per element of small"""
+    if not len(small) or not len(large):
+        return small[:0]
+    found = large[np.searchsorted(large, small).clip(max=len(large) - 1)] == small
+    return small[found]
+
+class EmployeeSearchIndex:
+    """
+    Ranked prefix, substring and fuzzy search over employee IDs and names
+    """
+    
+    def __init__(self, df):
+        """
+        Build the index
+        
+        Args:
+            df: DataFrame with employee_id and name columns; search results
+                are row positions in this frame
+        """
+        ids = df['employee_id'].astype(str).str.upper().to_numpy()
+        names = df['name'].fillna('').astype(str).str.lower().to_numpy()
+        
+        # Documents are numbered in employee ID order, so ascending document
+        # numbers are already the tie-break order
+        order = np.argsort(ids, kind='stable')
+        n_docs = len(order)
+        self._positions = order
+        self._ids = ids[order].astype(str)
+        self._names = names[order].tolist()
+        self._lower_ids = [employee_id.lower() for employee_id in self._ids]
+        
+        # Sorted (word, document) pairs for name word prefixes
+        name_words = [name.split() for name in self._names]
+        words = np.array([word for split in name_words for word in split], dtype=str)
+        word_docs = np.repeat(np.arange(n_docs), [len(split) for split in name_words])
+        word_order = np.argsort(words, kind='stable')
+        self._words = words[word_order]
+        self._word_docs = word_docs[word_order]
+        
+        # Trigram postings: the documents of each trigram key, as one array
+        # grouped by key with a (start, end) slice per key
+        texts = [_pad(employee_id) + _pad(name) for employee_id, name in zip(self._lower_ids, self._names)]
+        lengths = np.array([len(text) for text in texts], dtype=np.int64)
+        keys = _trigram_keys(_code_points(''.join(texts)))
+        docs = np.repeat(np.arange(n_docs), lengths)[:len(keys)]
+        ends = np.cumsum(lengths)
+        within = np.arange(len(keys)) + 2 < ends[docs] if len(keys) else np.zeros(0, dtype=bool)
+        keys, docs = keys[within], docs[within]
+        
+        pair_order = np.lexsort((docs, keys))
+        keys, docs = keys[pair_order], docs[pair_order]
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (docs[1:] != docs[:-1])
+        keys, docs = keys[first], docs[first]
+        
+        self._trigram_keys, starts = np.unique(keys, return_index=True)
+        self._posting_bounds = np.append(starts, len(keys))
+        self._posting_docs = docs
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def _postings(self, keys):
+        """Return the sorted documents of each trigram key, or None for keys not in the index"""
+        found = np.searchsorted(self._trigram_keys, keys)
+        postings = []
+        for key, i in zip(keys.tolist(), found.tolist()):
+            if i < len(self._trigram_keys) and self._trigram_keys[i] == key:
+                postings.append(self._posting_docs[self._posting_bounds[i]:self._posting_bounds[i + 1]])
+            else:
+                postings.append(None)
+        return postings
+    
+    def search(self, query, limit=DEFAULT_RESULT_LIMIT, rows=None):
+        """
+        Find employees by ID or name
+        
+        Args:
+            query: Search text, matched case-insensitively
+            limit: Maximum number of results
+            rows: Optional (start, end) range of row positions to search
+                within, such as a WellnessDataset department slice
+        
+        Returns:
+            Array of row positions in the indexed frame, best matches first
+        """
+        query = ' '.join(query.lower().split())
+        if not query or limit <= 0:
+            return np.array([], dtype=np.int64)
+        
+        start, end = rows if rows is not None else (0, len(self._positions))
+        results = []
+        seen = set()
+        
+        def take(docs, matches=None):
+            # Add documents in order, skipping repeats, rows outside the range
+            # and, when given, documents the matches check rejects
+            for block_start in range(0, len(docs), CHECK_BLOCK_SIZE):
+                block = docs[block_start:block_start + CHECK_BLOCK_SIZE]
+                positions = self._positions[block]
+                for doc in block[(positions >= start) & (positions < end)].tolist():
+                    if doc not in seen and (matches is None or matches(doc)):
+                        seen.add(doc)
+                        results.append(doc)
+                        if len(results) == limit:
+                            return True
+            return False
+        
+        def contains(doc):
+            return query in self._lower_ids[doc] or query in self._names[doc]
+        
+        # Exact ID, then ID prefix; both are one range of the sorted IDs
+        id_start, id_end = _prefix_range(self._ids, query.upper())
+        docs = np.arange(id_start, id_end)
+        exact = docs[self._ids[id_start:id_end] == query.upper()]
+        if take(exact) or take(docs):
+            return self._positions[results]
+        
+        # Name word prefix, for the last word typed so far and every earlier one
+        query_words = query.split()
+        word_start, word_end = _prefix_range(self._words, query_words[-1])
+        docs = np.unique(self._word_docs[word_start:word_end])
+        for word in query_words[:-1]:
+            word_start, word_end = _prefix_range(self._words, word)
+            docs = _intersect(docs, np.unique(self._word_docs[word_start:word_end]))
+        if take(docs):
+            return self._positions[results]
+        
+        # Substring: intersect the employees holding every trigram of the query,
+        # smallest list first, then confirm the text really contains it. Shorter
+        # queries have no trigram to narrow by and check rows in ID order.
+        if len(query) < MIN_TRIGRAM_QUERY_LENGTH:
+            take(np.arange(len(self._ids)), contains)
+            return self._positions[results]
+        
+        postings = self._postings(_trigram_keys(_code_points(query)))
+        if all(docs is not None for docs in postings):
+            postings.sort(key=len)
+            docs = postings[0]
+            for other in postings[1:]:
+                docs = _intersect(docs, other)
+            if take(docs, contains):
+                return self._positions[results]
+        
+        if results:
+            return self._positions[results]
+        
+        # Fuzzy, only when nothing else matched: rank by the share of the
+        # query's padded trigrams an employee has, then by employee ID
+        query_keys = np.unique(_trigram_keys(_code_points(_pad(query))))
+        postings = [docs for docs in self._postings(query_keys) if docs is not None]
+        if postings:
+            shared = np.bincount(np.concatenate(postings), minlength=len(self._ids))
+            candidates = np.flatnonzero(shared >= FUZZY_MIN_SIMILARITY * len(query_keys))
+            take(candidates[np.argsort(-shared[candidates], kind='stable')])
+        
+        return self._positions[results]
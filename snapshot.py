@@ -0,0 +1,217 @@
+"""
+Process-wide data snapshots shared by every dashboard session
+
+SnapshotService builds each requested view once per data version and
+hands the same immutable Snapshot to every session, so the number of
+viewers does not multiply database loads or copies of the data. A
+background thread watches the data version and rebuilds the views in
+use when it changes or they reach their maximum age; sessions keep
+reading the previous snapshot until the new one is published.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How often the background thread checks the data version
+SNAPSHOT_POLL_SECONDS = float(os.environ.get('SNAPSHOT_POLL_SECONDS', '5'))
+
+# Views nobody has asked for in this many maximum ages are dropped instead of refreshed
+IDLE_AGES = 2
+
+def freeze_frame(df):
+    """
+    Convert a DataFrame to Arrow-backed columns
+    
+    The columns are zero-copy views of one immutable Arrow table, which
+    stores strings far more compactly than Python objects.
+    
+    Args:
+        df: DataFrame, or None
+    
+    Returns:
+        DataFrame with ArrowDtype columns and a RangeIndex, or None
+    """
+    if df is None:
+        return None
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+@dataclass(frozen=True)
+class Snapshot:
+    """A view built for one data version; shared by every session and never modified"""
+    key: str
+    version: int
+    loaded_at: datetime
+    value: object
+
+class SnapshotService:
+    """
+    Builds views on first use and keeps them current in a background thread
+    
+    Only one thread builds a given view at a time; sessions that ask for it
+    meanwhile wait for that build instead of starting their own.
+    """
+    
+    def __init__(self, build, version_source, max_age_seconds, poll_seconds=SNAPSHOT_POLL_SECONDS):
+        """
+        Create the service; the background thread starts on the first request
+        
+        Args:
+            build: Function taking a view key and returning its value, or None if error
+            version_source: Function returning the current data version, or None if error
+            max_age_seconds: Age after which a view is rebuilt even without a new version
+            poll_seconds: Interval between data version checks
+        """
+        self.build = build
+        self.version_source = version_source
+        self.max_age_seconds = max_age_seconds
+        self.poll_seconds = poll_seconds
+        self._snapshots = {}
+        self._last_used = {}
+        self._build_locks = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {'builds': 0, 'failures': 0, 'requests': 0}
+    
+    def _build_lock(self, key):
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+    
+    def _is_current(self, snapshot, version):
+        age = (datetime.now() - snapshot.loaded_at).total_seconds()
+        return snapshot.version == version and age <= self.max_age_seconds
+    
+    def _refresh(self, key, version, stale=None):
+        """Build and publish a view unless another thread already replaced stale"""
+        with self._build_lock(key):
+            current = self._snapshots.get(key)
+            if current is not None and current is not stale:
+                return current
+            
+            start_time = time.perf_counter()
+            try:
+                value = self.build(key)
+            except Exception as e:
+                value = None
+                logger.error(f"Error building snapshot {key}: {e}")
+            if value is None:
+                with self._lock:
+                    self._stats['failures'] += 1
+                return current
+            
+            snapshot = Snapshot(key=key, version=version, loaded_at=datetime.now(), value=value)
+            with self._lock:
+                self._snapshots[key] = snapshot
+                self._stats['builds'] += 1
+            logger.info(
+                f"Published snapshot {key} for data version {version} "
+                f"in {time.perf_counter() - start_time:.2f}s"
+            )
+            return snapshot
+    
+    def get(self, key):
+        """
+        Get the current snapshot of a view, building it if this is the first request
+        
+        Args:
+            key: View key passed to build
+        
+        Returns:
+            Snapshot, or None if the view could not be built
+        """
+        self._start()
+        with self._lock:
+            self._last_used[key] = time.monotonic()
+            self._stats['requests'] += 1
+            snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            return snapshot
+        
+        version = self.version_source()
+        if version is None:
+            return None
+        return self._refresh(key, version)
+    
+    def invalidate(self, key=None):
+        """
+        Rebuild views on their next request
+        
+        Args:
+            key: View to drop, or None for all of them
+        """
+        with self._lock:
+            if key is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(key, None)
+    
+    def stats(self):
+        """
+        Get the snapshot counters since startup
+        
+        Returns:
+            Dictionary with builds, failures, requests and the data version
+            and age in seconds of each published view
+        """
+        now = datetime.now()
+        with self._lock:
+            stats = dict(self._stats)
+            stats['views'] = {
+                key: {'version': snapshot.version, 'age_seconds': (now - snapshot.loaded_at).total_seconds()}
+                for key, snapshot in self._snapshots.items()
+            }
+        return stats
+    
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='snapshot-refresh', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.refresh_stale()
+            except Exception as e:
+                logger.error(f"Error refreshing snapshots: {e}")
+    
+    def refresh_stale(self):
+        """
+        Rebuild every view in use whose data version or age is out of date
+        
+        Called by the background thread; views unused for IDLE_AGES maximum
+        ages are dropped rather than rebuilt.
+        
+        Returns:
+            Number of views rebuilt
+        """
+        version = self.version_source()
+        if version is None:
+            return 0
+        
+        idle_after = IDLE_AGES * self.max_age_seconds
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, used in self._last_used.items() if now - used > idle_after]:
+                del self._last_used[key]
+                self._snapshots.pop(key, None)
+            stale = [
+                snapshot for snapshot in self._snapshots.values()
+                if not self._is_current(snapshot, version)
+            ]
+        
+        for snapshot in stale:
+            self._refresh(snapshot.key, version, stale=snapshot)
+        return len(stale)
@@ -3,7 +3,7 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # Constants for health metrics
 MIN_HEART_RATE = 60
@@ -11,6 +11,13 @@ MAX_HEART_RATE = 100
 MIN_SPO2 = 92
 MAX_SPO2 = 100
 
+DEPARTMENTS = ['Engineering', 'Marketing', 'Finance', 'HR', 'Operations', 'Sales']
+
+# Mood categories in order of rising stress, and the stress score at which
+# each mood after Calm starts (must match determine_mood)
+MOOD_LABELS = ['Calm', 'Relaxed', 'Moderate', 'Tense', 'Stressed']
+MOOD_THRESHOLDS = [30, 50, 70, 85]
+
 def generate_demo_data(n_employees=50):
     """
     Generate demo data for HR wellness dashboard
@@ -21,19 +28,17 @@ def generate_demo_data(n_employees=50):
     Returns:
         DataFrame with employee health metrics
     """
-    np.random.seed(42)  # For reproducible results
-    
-    departments = ['Engineering', 'Marketing', 'Finance', 'HR', 'Operations', 'Sales']
+    rng = np.random.default_rng(42)  # For reproducible results
     
     # Generate random data
     data = {
         'employee_id': [f'EMP{i:03d}' for i in range(1, n_employees+1)],
         'name': [f'Employee {i}' for i in range(1, n_employees+1)],
-        'department': np.random.choice(departments, size=n_employees),
-        'age': np.random.randint(22, 60, size=n_employees),
-        'gender': np.random.choice(['Male', 'Female'], size=n_employees),
-        'heart_rate': np.random.randint(MIN_HEART_RATE, MAX_HEART_RATE, size=n_employees),
-        'spo2': np.random.randint(MIN_SPO2, MAX_SPO2, size=n_employees),
+        'department': rng.choice(DEPARTMENTS, size=n_employees),
+        'age': rng.integers(22, 60, size=n_employees),
+        'gender': rng.choice(['Male', 'Female'], size=n_employees),
+        'heart_rate': rng.integers(MIN_HEART_RATE, MAX_HEART_RATE, size=n_employees),
+        'spo2': rng.integers(MIN_SPO2, MAX_SPO2, size=n_employees),
     }
     
     df = pd.DataFrame(data)
@@ -43,15 +48,83 @@ def generate_demo_data(n_employees=50):
     df['stress_score'] = calculate_stress_score(df['heart_rate'], df['spo2'])
     
     # Determine mood based on stress levels
-    df['mood'] = df['stress_score'].apply(determine_mood)
+    df['mood'] = classify_moods(df['stress_score'])
     
     # Add timestamp for when data was last updated
-    current_time = datetime.now()
-    time_range = [current_time - timedelta(minutes=np.random.randint(5, 60)) for _ in range(n_employees)]
-    df['last_updated'] = time_range
+    df['last_updated'] = datetime.now() - pd.to_timedelta(rng.integers(5, 60, size=n_employees), unit='m')
     
     return df
 
+def generate_time_series(n_employees, start, end, interval='1min', chunk_size=50000, seed=42):
+    """
+    Generate realistic health metric time series for load testing
+    
+    Every employee gets a reading at each interval between start and end.
+    Heart rate and SpO2 follow a per-employee baseline, a department offset,
+    a daily cycle that peaks in the afternoon and hour-long stress episodes,
+    plus sensor noise, and are rounded and clipped to the sensor ranges.
+    Readings are yielded in chunks of whole time steps, so memory use
+    depends on chunk_size and not on the length of the span.
+    
+    Args:
+        n_employees: Number of employees
+        start: Time of the first reading
+        end: End of the span (exclusive)
+        interval: Sampling interval, e.g. '1min' or a timedelta
+        chunk_size: Approximate number of readings per chunk
+        seed: Seed for numpy.random.Generator; the same arguments give the same data
+    
+    Yields:
+        DataFrames with the employee columns, heart_rate, spo2, stress_score,
+        mood and timestamp, ready for database.bulk_insert_data
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    step = pd.Timedelta(interval)
+    n_steps = int(np.ceil((pd.Timestamp(end) - start) / step))
+    width = max(3, len(str(n_employees)))
+    
+    # Per-employee attributes, drawn once and broadcast into every chunk;
+    # object arrays so each chunk only copies references to the strings
+    employee_ids = np.array([f'EMP{i:0{width}d}' for i in range(1, n_employees + 1)], dtype=object)
+    names = np.array([f'Employee {i}' for i in range(1, n_employees + 1)], dtype=object)
+    departments = rng.choice(np.array(DEPARTMENTS, dtype=object), size=n_employees)
+    ages = rng.integers(22, 60, size=n_employees)
+    genders = rng.choice(np.array(['Male', 'Female'], dtype=object), size=n_employees)
+    department_offsets = dict(zip(DEPARTMENTS, rng.normal(0, 3, size=len(DEPARTMENTS))))
+    baseline_hr = rng.normal(74, 5, size=n_employees) + pd.Series(departments).map(department_offsets).to_numpy()
+    baseline_spo2 = rng.normal(97, 1, size=n_employees)
+    
+    steps_per_chunk = max(1, chunk_size // n_employees)
+    for first_step in range(0, n_steps, steps_per_chunk):
+        steps = np.arange(first_step, min(first_step + steps_per_chunk, n_steps))
+        times = start + pd.to_timedelta(steps * step.value, unit='ns')
+        hours = (times - times.normalize()) / pd.Timedelta(hours=1)
+        daily_cycle = np.sin(2 * np.pi * (hours.to_numpy() - 9) / 24)
+        
+        idx = np.tile(np.arange(n_employees), len(steps))
+        cycle = np.repeat(daily_cycle, n_employees)
+        # Stress episodes last a whole hour: a hash of employee and hour picks
+        # about 1 in 12 employee-hours, the same whichever chunk they fall in
+        hour_index = np.repeat(((times - start) // pd.Timedelta(hours=1)).to_numpy(), n_employees)
+        episode = (idx.astype(np.uint64) * 2654435761 + hour_index.astype(np.uint64) * 40503) % 12 == 0
+        heart_rate = baseline_hr[idx] + 6 * cycle + 18 * episode + rng.normal(0, 4, size=len(idx))
+        spo2 = baseline_spo2[idx] - 0.5 * cycle - 2 * episode + rng.normal(0, 0.8, size=len(idx))
+        
+        chunk = pd.DataFrame({
+            'employee_id': employee_ids[idx],
+            'name': names[idx],
+            'department': departments[idx],
+            'age': ages[idx],
+            'gender': genders[idx],
+            'heart_rate': heart_rate.round().clip(MIN_HEART_RATE, MAX_HEART_RATE),
+            'spo2': spo2.round().clip(MIN_SPO2, MAX_SPO2),
+            'timestamp': np.repeat(times.to_numpy(), n_employees),
+        })
+        chunk['stress_score'] = calculate_stress_score(chunk['heart_rate'], chunk['spo2'])
+        chunk['mood'] = classify_moods(chunk['stress_score'])
+        yield chunk
+
 def calculate_stress_score(heart_rate, spo2):
     """
     Calculate stress score based on heart rate and SpO2
@@ -95,6 +168,23 @@ def determine_mood(stress_score):
     else:
         return 'Stressed'
 
+def classify_moods(stress_scores):
+    """
+    Determine moods for many stress scores at once
+    
+    Vectorized equivalent of determine_mood with the same boundaries: each
+    score is binned with np.digitize, so NaN falls into 'Stressed' exactly as
+    in the scalar version.
+    
+    Args:
+        stress_scores: Series or array of stress scores (0-100)
+    
+    Returns:
+        Ordered pandas Categorical of moods, aligned with the input
+    """
+    codes = np.digitize(np.asarray(stress_scores, dtype=float), MOOD_THRESHOLDS)
+    return pd.Categorical.from_codes(codes, categories=MOOD_LABELS, ordered=True)
+
 def get_mood_emoji(mood):
     """
     Get emoji representation for mood
@@ -124,7 +214,7 @@ def plot_department_stress(df):
     Returns:
         Plotly figure
     """
-    dept_stress = df.groupby('department')['stress_score'].mean().reset_index()
+    dept_stress = df.groupby('department', observed=True)['stress_score'].mean().reset_index()
     dept_stress = dept_stress.sort_values('stress_score', ascending=False)
     
     fig = px.bar(
@@ -148,6 +238,43 @@ def plot_department_stress(df):
     
     return fig
 
+def plot_stress_trend(trend_df, department=None):
+    """
+    Create a line chart of average stress levels over time by department
+    
+    Args:
+        trend_df: DataFrame with department, bucket and stress_score columns
+        department: Optional filter by department
+    
+    Returns:
+        Plotly figure
+    """
+    if department and department != 'All Departments':
+        trend_df = trend_df[trend_df['department'] == department]
+        title = f'Stress Trend - {department}'
+    else:
+        title = 'Stress Trend - All Departments'
+    
+    fig = px.line(
+        trend_df,
+        x='bucket',
+        y='stress_score',
+        color='department',
+        markers=True,
+        title=title,
+        labels={'stress_score': 'Stress Score', 'bucket': 'Time', 'department': 'Department'},
+        template='plotly_dark'
+    )
+    
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12),
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    
+    return fig
+
 def plot_heart_rate_distribution(df, department=None):
     """
     Create a histogram of heart rate distribution
@@ -391,7 +518,7 @@ def create_department_comparison_chart(df):
         Plotly figure
     """
     # Calculate averages by department
-    dept_metrics = df.groupby('department').agg({
+    dept_metrics = df.groupby('department', observed=True).agg({
         'heart_rate': 'mean',
         'spo2': 'mean',
         'stress_score': 'mean'